@@ -4,59 +4,110 @@ import numpy as np
 # Analyze enrolment-to-maintenance transition and update fatigue
 # Need to look at temporal patterns and cohort transitions
 
-# Combine all data with dates for temporal analysis
-enrol_temporal = unified_enrolment.copy()
-enrol_temporal['operation_type'] = 'enrolment'
-
-demo_temporal = unified_demographic.copy()
-demo_temporal['operation_type'] = 'demographic_update'
-
-bio_temporal = unified_biometric.copy()
-bio_temporal['operation_type'] = 'biometric_update'
-
-# Standardize columns for unified analysis
-enrol_temporal['operations'] = enrol_temporal[['age_0_5', 'age_5_17', 'age_18_greater']].sum(axis=1)
-demo_temporal['operations'] = demo_temporal[['demo_age_5_17', 'demo_age_17_']].sum(axis=1)
-bio_temporal['operations'] = bio_temporal[['bio_age_5_17', 'bio_age_17_']].sum(axis=1)
-
-# Create unified operations view
-enrol_ops = enrol_temporal[['Date', 'state', 'district', 'operation_type', 'operations', 'Month', 'Month_Year']].copy()
-demo_ops = demo_temporal[['Date', 'state', 'district', 'operation_type', 'operations', 'Month', 'Month_Year']].copy()
-bio_ops = bio_temporal[['Date', 'state', 'district', 'operation_type', 'operations', 'Month', 'Month_Year']].copy()
-
-all_operations = pd.concat([enrol_ops, demo_ops, bio_ops], ignore_index=True)
+# Operation types mapped to their source dataset and age-band columns
+# Each type is aggregated on its own, so the three raw datasets are never copied or concatenated
+operation_sources = {
+    'enrolment': (unified_enrolment, ['age_0_5', 'age_5_17', 'age_18_greater']),
+    'demographic_update': (unified_demographic, ['demo_age_5_17', 'demo_age_17_']),
+    'biometric_update': (unified_biometric, ['bio_age_5_17', 'bio_age_17_'])
+}
+
+def aggregate_operations_by_type(key):
+    """Sum operations per key value for each operation type, returning one Series per type"""
+    per_type = {}
+    for op_type, (source_df, age_cols) in operation_sources.items():
+        row_operations = source_df[age_cols].sum(axis=1)
+        per_type[op_type] = row_operations.groupby(source_df[key]).sum().sort_index()
+    return per_type
+
+def pivot_operations_by_type(per_type, key):
+    """Align per-type aggregates into a key × operation_type frame"""
+    pivot = pd.DataFrame(per_type).fillna(0)
+    pivot.index.name = key
+    return pivot.reset_index()
 
 # --- TRANSITION POINT ANALYSIS ---
-# Group by date and operation type to identify transition points
-daily_by_type = all_operations.groupby(['Date', 'operation_type'])['operations'].sum().reset_index()
-daily_pivot = daily_by_type.pivot(index='Date', columns='operation_type', values='operations').fillna(0).reset_index()
+# Aggregate by date and operation type to identify transition points
+daily_by_type = aggregate_operations_by_type('Date')
+daily_pivot = pivot_operations_by_type(daily_by_type, 'Date')
 daily_pivot = daily_pivot.sort_values('Date')
 
+# Transition rule: updates exceed enrolments on `transition_window` consecutive days
+transition_threshold = 1.0  # Updates equal or exceed enrolments
+transition_window = 3
+
+def first_sustained_run(dominance, window):
+    """Return, per row, the column index where the first run of `window` True values ends (-1 if none)"""
+    dominance = np.atleast_2d(dominance)
+    n_rows, n_days = dominance.shape
+    if window > n_days:
+        return np.full(n_rows, -1)
+    # Cumulative counts turn every window sum into a single subtraction
+    run_counts = np.zeros((n_rows, n_days + 1), dtype=np.int64)
+    np.cumsum(dominance, axis=1, out=run_counts[:, 1:])
+    sustained = (run_counts[:, window:] - run_counts[:, :-window]) == window
+    return np.where(sustained.any(axis=1), sustained.argmax(axis=1) + window - 1, -1)
+
 # Calculate daily update-to-enrolment ratio to identify when updates dominate
 if 'enrolment' in daily_pivot.columns:
     daily_pivot['total_updates'] = daily_pivot.get('demographic_update', 0) + daily_pivot.get('biometric_update', 0)
     daily_pivot['update_to_enrol_ratio'] = daily_pivot['total_updates'] / daily_pivot['enrolment'].replace(0, np.nan)
     
     # Find transition point where updates consistently exceed enrolments
-    transition_threshold = 1.0  # Updates equal or exceed enrolments
     daily_pivot['update_dominates'] = daily_pivot['update_to_enrol_ratio'] > transition_threshold
     
     # Find first sustained transition point (3+ consecutive days)
-    daily_pivot['consecutive_update_dominance'] = daily_pivot['update_dominates'].rolling(window=3, min_periods=3).sum()
-    transition_dates = daily_pivot[daily_pivot['consecutive_update_dominance'] >= 3]
+    national_transition_idx = first_sustained_run(daily_pivot['update_dominates'].to_numpy(), transition_window)[0]
     
-    if len(transition_dates) > 0:
-        transition_point = transition_dates.iloc[0]['Date']
+    if national_transition_idx >= 0:
+        transition_point = daily_pivot['Date'].iloc[national_transition_idx]
         print("=== ENROLMENT-TO-MAINTENANCE TRANSITION ANALYSIS ===")
         print(f"\nTransition point identified: {transition_point.strftime('%Y-%m-%d')}")
-        print(f"Date when updates began consistently exceeding enrolments (3-day window)")
+        print(f"Date when updates began consistently exceeding enrolments ({transition_window}-day window)")
     else:
         print("=== ENROLMENT-TO-MAINTENANCE TRANSITION ANALYSIS ===")
         print("\nNo clear transition point found - enrolments remain dominant or pattern is mixed")
 
+# --- REGIONAL TRANSITION ANALYSIS ---
+# Same rule evaluated for every district and state at once over the region × day panels from the temporal block
+transition_date_axis = panel_dates
+
+def rank_region_transitions(region_index, enrolment_matrix, update_matrix, region_cols):
+    """Detect each region's transition date and rank regions from earliest to latest"""
+    dominance = (enrolment_matrix > 0) & (update_matrix > transition_threshold * enrolment_matrix)
+    transition_idx = first_sustained_run(dominance, transition_window)
+    has_transition = transition_idx >= 0
+    
+    ranking = region_index.to_frame(index=False)
+    ranking.columns = region_cols
+    ranking['transition_date'] = pd.NaT
+    ranking.loc[has_transition, 'transition_date'] = transition_date_axis[transition_idx[has_transition]]
+    ranking['days_from_start'] = (ranking['transition_date'] - transition_date_axis[0]).dt.days
+    ranking['dominance_days'] = dominance.sum(axis=1)
+    ranking['transition_rank'] = ranking['transition_date'].rank(method='min')
+    return ranking.sort_values(['transition_date'] + region_cols, na_position='last').reset_index(drop=True)
+
+district_index = pd.MultiIndex.from_frame(panel_districts)
+state_codes, state_index = panel_state_codes, panel_states
+district_update_matrix = district_daily_demo_updates + district_daily_bio_updates
+state_update_matrix = state_daily_demo_updates + state_daily_bio_updates
+
+state_transitions = rank_region_transitions(pd.MultiIndex.from_arrays([state_index], names=['state']),
+                                            state_daily_enrolments, state_update_matrix, ['state'])
+district_transitions = rank_region_transitions(district_index, district_daily_enrolments, district_update_matrix,
+                                               ['state', 'district'])
+
+print(f"\n=== REGIONAL TRANSITION POINTS ({transition_window}-day window) ===")
+for level_name, ranking in [('States', state_transitions), ('Districts', district_transitions)]:
+    transitioned = ranking['transition_date'].notna().sum()
+    print(f"\n{level_name} transitioned: {transitioned} of {len(ranking)}")
+    if transitioned > 0:
+        print(f"Earliest {level_name.lower()} to shift into maintenance mode:")
+        print(ranking[ranking['transition_date'].notna()].head(10).to_string(index=False))
+
 # Monthly transition analysis
-monthly_by_type = all_operations.groupby(['Month_Year', 'operation_type'])['operations'].sum().reset_index()
-monthly_pivot = monthly_by_type.pivot(index='Month_Year', columns='operation_type', values='operations').fillna(0).reset_index()
+monthly_by_type = aggregate_operations_by_type('Month_Year')
+monthly_pivot = pivot_operations_by_type(monthly_by_type, 'Month_Year')
 
 if 'enrolment' in monthly_pivot.columns:
     monthly_pivot['total_updates'] = monthly_pivot.get('demographic_update', 0) + monthly_pivot.get('biometric_update', 0)
@@ -70,11 +121,11 @@ if 'enrolment' in monthly_pivot.columns:
 # Analyze temporal distribution of updates to identify fatigue patterns
 # Look at growth rates and volatility over time
 
-monthly_demo = demo_temporal.groupby('Month_Year')['operations'].sum().reset_index()
+monthly_demo = monthly_by_type['demographic_update'].rename('operations').reset_index()
 monthly_demo = monthly_demo.sort_values('Month_Year')
 monthly_demo['demo_pct_change'] = monthly_demo['operations'].pct_change() * 100
 
-monthly_bio = bio_temporal.groupby('Month_Year')['operations'].sum().reset_index()
+monthly_bio = monthly_by_type['biometric_update'].rename('operations').reset_index()
 monthly_bio = monthly_bio.sort_values('Month_Year')
 monthly_bio['bio_pct_change'] = monthly_bio['operations'].pct_change() * 100
 
@@ -104,4 +155,65 @@ if demo_velocity_trend < 0 or bio_velocity_trend < 0:
 else:
     print("✓ Positive growth velocity - updates are increasing over time")
 
+# --- MANDATORY BIOMETRIC UPDATE (MBU) PROJECTION ---
+# Children enrolled today owe biometric updates at ages 5 and 15; convolving each district's monthly
+# child enrolments with an eligibility kernel gives the update load those cohorts will generate
+from scipy.signal import fftconvolve
+
+mbu_update_ages = (5, 15)
+mbu_age_bands = {'age_0_5': (0, 5), 'age_5_17': (5, 18)}  # Age range (years) covered by each enrolment band
+mbu_projection_months = 60
+
+def mbu_eligibility_kernel(age_low, age_high, update_ages=mbu_update_ages):
+    """Share of a band's enrolments falling due k months after enrolment (index k), ages uniform across the band"""
+    ages_at_enrolment = np.arange(age_low * 12, age_high * 12)
+    delays = np.concatenate([update_age * 12 - ages_at_enrolment for update_age in update_ages])
+    delays = delays[delays > 0]
+    return np.bincount(delays, minlength=max(update_ages) * 12 + 1) / len(ages_at_enrolment)
+
+def project_mbu_load(band_matrices, kernels, n_future):
+    """Forward monthly update load (n_regions × n_future) from per-band enrolment matrices, convolved in one FFT pass"""
+    n_months = next(iter(band_matrices.values())).shape[1]
+    load = np.zeros((next(iter(band_matrices.values())).shape[0], n_future))
+    for band, matrix in band_matrices.items():
+        convolved = fftconvolve(matrix, kernels[band][None, :], axes=1)
+        future = convolved[:, n_months:n_months + n_future]
+        load[:, :future.shape[1]] += np.maximum(future, 0)
+    return load
+
+# District × month child-enrolment matrices aligned to the transition district index
+_enrolment_months = unified_enrolment['Date'].dt.to_period('M')
+mbu_enrolment_months = pd.period_range(_enrolment_months.min(), _enrolment_months.max(), freq='M')
+_band_totals = unified_enrolment.groupby([unified_enrolment['state'], unified_enrolment['district'], _enrolment_months])[
+    list(mbu_age_bands)].sum()
+_band_rows = district_index.get_indexer(_band_totals.index.droplevel(2))
+_band_cols = mbu_enrolment_months.get_indexer(_band_totals.index.get_level_values(2))
+mbu_band_matrices = {}
+for band in mbu_age_bands:
+    mbu_band_matrices[band] = np.zeros((len(district_index), len(mbu_enrolment_months)))
+    np.add.at(mbu_band_matrices[band], (_band_rows, _band_cols), _band_totals[band].to_numpy())
+
+mbu_kernels = {band: mbu_eligibility_kernel(*ages) for band, ages in mbu_age_bands.items()}
+mbu_future_months = pd.period_range(mbu_enrolment_months[-1] + 1, periods=mbu_projection_months, freq='M')
+district_mbu_projection = project_mbu_load(mbu_band_matrices, mbu_kernels, mbu_projection_months)
+state_mbu_projection = np.zeros((len(state_index), mbu_projection_months))
+np.add.at(state_mbu_projection, state_codes, district_mbu_projection)
+national_mbu_projection = pd.Series(district_mbu_projection.sum(axis=0), index=mbu_future_months)
+
+district_mbu_load = district_index.to_frame(index=False)
+district_mbu_load['next_12_months'] = district_mbu_projection[:, :12].sum(axis=1)
+district_mbu_load[f'next_{mbu_projection_months}_months'] = district_mbu_projection.sum(axis=1)
+district_mbu_load['peak_month'] = mbu_future_months[np.round(district_mbu_projection, 6).argmax(axis=1)]
+district_mbu_load = district_mbu_load.sort_values('next_12_months', ascending=False).reset_index(drop=True)
+
+print(f"\n=== MANDATORY BIOMETRIC UPDATE PROJECTION ===")
+print(f"\nCohorts: child enrolments {mbu_enrolment_months[0]} to {mbu_enrolment_months[-1]} "
+      f"(updates due at ages {' and '.join(map(str, mbu_update_ages))})")
+print(f"Projected updates from these cohorts alone (earlier cohorts not in the data are excluded):")
+for _year in range(mbu_projection_months // 12):
+    _year_months = mbu_future_months[_year * 12:(_year + 1) * 12]
+    print(f"  {_year_months[0]} to {_year_months[-1]}: {national_mbu_projection.iloc[_year * 12:(_year + 1) * 12].sum():,.0f}")
+print(f"\nDistricts with the largest projected update load over the next 12 months:")
+print(district_mbu_load.head(10).to_string(index=False, float_format=lambda value: f"{value:,.0f}"))
+
 print("\n✓ Update dynamics analyzed: transition points and fatigue patterns identified")
@@ -23,34 +23,117 @@ daily_ops_ts['operational_load'] = daily_ops_ts['operational_load'].fillna(0)
 daily_ops_ts['total_demo_updates'] = daily_ops_ts['total_demo_updates'].fillna(0)
 daily_ops_ts['total_bio_updates'] = daily_ops_ts['total_bio_updates'].fillna(0)
 
+def standardize_series(series):
+    """Zero-mean, unit-variance along the last (time) axis; constant series are only centred"""
+    std = series.std(axis=-1, keepdims=True)
+    return (series - series.mean(axis=-1, keepdims=True)) / np.where(std > 0, std, 1.0)
+
+def lagged_correlations(drivers, target, max_lag):
+    """Pearson correlation at every lag in [-max_lag, max_lag]; lag k pairs driver[t + k] with target[t], so negative lag = driver leads"""
+    x = np.asarray(drivers, dtype=float)
+    y = np.asarray(target, dtype=float)
+    n = x.shape[-1]
+    lags = np.arange(-max_lag, max_lag + 1)
+    
+    # Global standardisation keeps the FFT cross products well conditioned (Pearson is invariant to it)
+    x = standardize_series(x)
+    y = standardize_series(y)
+    
+    # Cross products sum(x[t + k] * y[t]) for all k; zero padding to 2n avoids circular wrap-around
+    n_fft = 1 << (2 * n - 1).bit_length()
+    cross = np.fft.irfft(np.fft.rfft(x, n_fft) * np.conj(np.fft.rfft(y, n_fft)), n_fft)
+    sum_xy = cross[..., lags % n_fft]
+    
+    # Per-lag overlap sums from cumulative sums
+    def _prefix(values):
+        return np.concatenate([np.zeros(values.shape[:-1] + (1,)), np.cumsum(values, axis=-1)], axis=-1)
+    x_start, x_end = np.maximum(lags, 0), n + np.minimum(lags, 0)
+    y_start, y_end = np.maximum(-lags, 0), n - np.maximum(lags, 0)
+    n_obs = np.maximum(n - np.abs(lags), 0)
+    x_prefix, xx_prefix = _prefix(x), _prefix(x * x)
+    y_prefix, yy_prefix = _prefix(y), _prefix(y * y)
+    sum_x = x_prefix[..., x_end] - x_prefix[..., x_start]
+    sum_xx = xx_prefix[..., x_end] - xx_prefix[..., x_start]
+    sum_y = y_prefix[..., y_end] - y_prefix[..., y_start]
+    sum_yy = yy_prefix[..., y_end] - yy_prefix[..., y_start]
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sum_xy - sum_x * sum_y / n_obs
+        var_x = np.maximum(sum_xx - sum_x ** 2 / n_obs, 0)
+        var_y = np.maximum(sum_yy - sum_y ** 2 / n_obs, 0)
+        correlation = np.clip(cov / np.sqrt(var_x * var_y), -1.0, 1.0)
+        
+        # Two-sided p-values from the t distribution with n - 2 degrees of freedom
+        dof = n_obs - 2
+        t_stat = correlation * np.sqrt(dof / np.maximum(1 - correlation ** 2, 1e-300))
+        p_value = np.where(dof > 0, 2 * stats.t.sf(np.abs(t_stat), np.maximum(dof, 1)), 1.0)
+    p_value = np.where(np.isnan(correlation), np.nan, p_value)
+    return correlation, p_value, n_obs, lags
+
+def block_bootstrap_correlations(drivers, target, max_lag, n_resamples=2000, block_length=7,
+                                 chunk_size=250, n_workers=1, seed=42):
+    """Moving-block bootstrap correlations (n_drivers × n_lags × n_resamples) of each driver with target at every lag"""
+    drivers = standardize_series(np.atleast_2d(np.asarray(drivers, dtype=float)))
+    target = standardize_series(np.asarray(target, dtype=float))
+    lags = np.arange(-max_lag, max_lag + 1)
+    
+    # Common sample of target days for which every lagged driver day exists
+    base_days = np.arange(max_lag, target.shape[-1] - max_lag)
+    n_days = len(base_days)
+    lagged_drivers = drivers[:, base_days[None, :] + lags[:, None]]
+    aligned_target = target[base_days]
+    
+    block_length = max(1, min(block_length, n_days))
+    rng = np.random.default_rng(seed)
+    block_starts = rng.integers(0, n_days - block_length + 1, size=(n_resamples, -(-n_days // block_length)))
+    resample_idx = (block_starts[:, :, None] + np.arange(block_length)).reshape(n_resamples, -1)[:, :n_days]
+    
+    boot_corr = np.empty((drivers.shape[0], len(lags), n_resamples))
+    
+    def _evaluate_chunk(start):
+        idx = resample_idx[start:start + chunk_size]
+        x = lagged_drivers[:, :, idx]
+        y = aligned_target[idx]
+        x = x - x.mean(axis=-1, keepdims=True)
+        y = y - y.mean(axis=-1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            boot_corr[:, :, start:start + chunk_size] = (x * y).sum(axis=-1) / np.sqrt((x * x).sum(axis=-1) * (y * y).sum(axis=-1))
+    
+    run_in_chunks(_evaluate_chunk, n_resamples, chunk_size, n_workers)
+    return boot_corr
+
 # Cross-correlation analysis for different lags
 max_lag = 7  # Examine up to 7 days of lag
-correlations = []
-
-for lag in range(-max_lag, max_lag + 1):
-    if lag < 0:
-        # Updates lead operational load (negative lag)
-        update_series = daily_ops_ts['update_volume'].iloc[:lag].values
-        load_series = daily_ops_ts['operational_load'].iloc[-lag:].values
-    elif lag > 0:
-        # Operational load leads updates (positive lag)
-        update_series = daily_ops_ts['update_volume'].iloc[lag:].values
-        load_series = daily_ops_ts['operational_load'].iloc[:-lag].values
-    else:
-        # Contemporaneous relationship
-        update_series = daily_ops_ts['update_volume'].values
-        load_series = daily_ops_ts['operational_load'].values
-    
-    if len(update_series) > 1 and len(load_series) > 1:
-        corr, p_value = stats.pearsonr(update_series, load_series)
-        correlations.append({
-            'lag_days': lag,
-            'correlation': corr,
-            'p_value': p_value
-        })
-
-lag_df = pd.DataFrame(correlations)
-lag_df['significant'] = lag_df['p_value'] < 0.05
+lead_lag_workers = 4
+
+# All driver series are scanned against operational load in one call
+lead_lag_drivers = ['update_volume', 'total_demo_updates', 'total_bio_updates']
+driver_matrix = daily_ops_ts[lead_lag_drivers].to_numpy(dtype=float).T
+load_series = daily_ops_ts['operational_load'].to_numpy(dtype=float)
+lag_corr, lag_pvalues, lag_nobs, lag_values = lagged_correlations(driver_matrix, load_series, max_lag)
+
+# pearsonr-style p-values assume independent days; block-bootstrap intervals do not
+bootstrap_confidence = 0.95
+lag_boot = block_bootstrap_correlations(driver_matrix, load_series, max_lag, n_workers=lead_lag_workers)
+lag_ci_lower = np.nanpercentile(lag_boot, 100 * (1 - bootstrap_confidence) / 2, axis=-1)
+lag_ci_upper = np.nanpercentile(lag_boot, 100 * (1 + bootstrap_confidence) / 2, axis=-1)
+lag_boot_p = np.minimum(1.0, 2 * np.minimum(np.mean(lag_boot <= 0, axis=-1), np.mean(lag_boot >= 0, axis=-1)))
+
+def lag_table(driver_idx):
+    """Tabulate one driver's correlation and bootstrap interval at each lag with enough overlapping samples"""
+    valid = lag_nobs > 1
+    table = pd.DataFrame({
+        'lag_days': lag_values[valid],
+        'correlation': lag_corr[driver_idx, valid],
+        'p_value': lag_pvalues[driver_idx, valid],
+        'ci_lower': lag_ci_lower[driver_idx, valid],
+        'ci_upper': lag_ci_upper[driver_idx, valid],
+        'bootstrap_p': lag_boot_p[driver_idx, valid]
+    })
+    table['significant'] = (table['ci_lower'] > 0) | (table['ci_upper'] < 0)
+    return table
+
+lag_df = lag_table(lead_lag_drivers.index('update_volume'))
 
 # Find strongest lead-lag relationship
 max_corr_idx = lag_df['correlation'].abs().idxmax()
@@ -59,8 +142,9 @@ strongest_lag = lag_df.loc[max_corr_idx]
 print(f"\n🔍 CROSS-CORRELATION RESULTS")
 print(f"\nStrongest correlation found at lag = {strongest_lag['lag_days']} days")
 print(f"  Correlation coefficient: {strongest_lag['correlation']:.4f}")
-print(f"  P-value: {strongest_lag['p_value']:.6f}")
-print(f"  Statistical significance: {'Yes (p < 0.05)' if strongest_lag['significant'] else 'No (p >= 0.05)'}")
+print(f"  P-value (independent-days assumption): {strongest_lag['p_value']:.6f}")
+print(f"  Block-bootstrap {bootstrap_confidence:.0%} CI: [{strongest_lag['ci_lower']:+.4f}, {strongest_lag['ci_upper']:+.4f}]")
+print(f"  Statistical significance: {'Yes (CI excludes 0)' if strongest_lag['significant'] else 'No (CI includes 0)'}")
 
 if strongest_lag['lag_days'] < 0:
     print(f"\n📌 Interpretation: Update volume LEADS operational load by {abs(strongest_lag['lag_days'])} days")
@@ -73,11 +157,11 @@ else:
 
 # Examine significant lags
 significant_lags = lag_df[lag_df['significant']].sort_values('correlation', ascending=False, key=abs)
-print(f"\nAll statistically significant lead-lag relationships (p < 0.05):")
+print(f"\nAll statistically significant lead-lag relationships (block-bootstrap {bootstrap_confidence:.0%} CI excludes 0):")
 if len(significant_lags) > 0:
     for _, row in significant_lags.iterrows():
         direction = "Updates lead" if row['lag_days'] < 0 else ("Load leads" if row['lag_days'] > 0 else "Simultaneous")
-        print(f"  Lag {row['lag_days']:+2d} days: r={row['correlation']:+.4f}, p={row['p_value']:.6f} ({direction})")
+        print(f"  Lag {row['lag_days']:+2d} days: r={row['correlation']:+.4f}, CI=[{row['ci_lower']:+.4f}, {row['ci_upper']:+.4f}], bootstrap p={row['bootstrap_p']:.4f} ({direction})")
 else:
     print("  No statistically significant lags found")
 
@@ -87,62 +171,22 @@ print("SEPARATE ANALYSIS: DEMOGRAPHIC vs BIOMETRIC UPDATES")
 print("=" * 90)
 
 # Demographic update lead-lag
-demo_correlations = []
-for lag in range(-max_lag, max_lag + 1):
-    if lag < 0:
-        demo_series = daily_ops_ts['total_demo_updates'].iloc[:lag].values
-        load_series = daily_ops_ts['operational_load'].iloc[-lag:].values
-    elif lag > 0:
-        demo_series = daily_ops_ts['total_demo_updates'].iloc[lag:].values
-        load_series = daily_ops_ts['operational_load'].iloc[:-lag].values
-    else:
-        demo_series = daily_ops_ts['total_demo_updates'].values
-        load_series = daily_ops_ts['operational_load'].values
-    
-    if len(demo_series) > 1 and len(load_series) > 1:
-        corr, p_value = stats.pearsonr(demo_series, load_series)
-        demo_correlations.append({
-            'lag_days': lag,
-            'correlation': corr,
-            'p_value': p_value
-        })
-
-demo_lag_df = pd.DataFrame(demo_correlations)
-demo_lag_df['significant'] = demo_lag_df['p_value'] < 0.05
+demo_lag_df = lag_table(lead_lag_drivers.index('total_demo_updates'))
 strongest_demo_lag = demo_lag_df.loc[demo_lag_df['correlation'].abs().idxmax()]
 
 print(f"\n📊 DEMOGRAPHIC UPDATES:")
 print(f"  Strongest correlation at lag = {strongest_demo_lag['lag_days']} days")
 print(f"  Correlation: {strongest_demo_lag['correlation']:.4f}, P-value: {strongest_demo_lag['p_value']:.6f}")
+print(f"  Block-bootstrap {bootstrap_confidence:.0%} CI: [{strongest_demo_lag['ci_lower']:+.4f}, {strongest_demo_lag['ci_upper']:+.4f}]")
 
 # Biometric update lead-lag
-bio_correlations = []
-for lag in range(-max_lag, max_lag + 1):
-    if lag < 0:
-        bio_series = daily_ops_ts['total_bio_updates'].iloc[:lag].values
-        load_series = daily_ops_ts['operational_load'].iloc[-lag:].values
-    elif lag > 0:
-        bio_series = daily_ops_ts['total_bio_updates'].iloc[lag:].values
-        load_series = daily_ops_ts['operational_load'].iloc[:-lag].values
-    else:
-        bio_series = daily_ops_ts['total_bio_updates'].values
-        load_series = daily_ops_ts['operational_load'].values
-    
-    if len(bio_series) > 1 and len(load_series) > 1:
-        corr, p_value = stats.pearsonr(bio_series, load_series)
-        bio_correlations.append({
-            'lag_days': lag,
-            'correlation': corr,
-            'p_value': p_value
-        })
-
-bio_lag_df = pd.DataFrame(bio_correlations)
-bio_lag_df['significant'] = bio_lag_df['p_value'] < 0.05
+bio_lag_df = lag_table(lead_lag_drivers.index('total_bio_updates'))
 strongest_bio_lag = bio_lag_df.loc[bio_lag_df['correlation'].abs().idxmax()]
 
 print(f"\n📊 BIOMETRIC UPDATES:")
 print(f"  Strongest correlation at lag = {strongest_bio_lag['lag_days']} days")
 print(f"  Correlation: {strongest_bio_lag['correlation']:.4f}, P-value: {strongest_bio_lag['p_value']:.6f}")
+print(f"  Block-bootstrap {bootstrap_confidence:.0%} CI: [{strongest_bio_lag['ci_lower']:+.4f}, {strongest_bio_lag['ci_upper']:+.4f}]")
 
 # Monthly lead-lag analysis
 monthly_ops_ts = monthly_trends.copy()
@@ -159,42 +203,271 @@ if len(monthly_ops_ts) > 2:
     print(f"  Updates vs Load: r={monthly_corr:.4f}, p={monthly_p:.6f}")
     print(f"  Significance: {'Strong relationship' if abs(monthly_corr) > 0.7 else 'Moderate relationship' if abs(monthly_corr) > 0.4 else 'Weak relationship'}")
 
-# Calculate Granger causality proxy using lagged regression
+# Time-varying lead-lag: the update → load relationship shifts around surges such as early January
+print(f"\n" + "=" * 90)
+print("ROLLING LEAD-LAG SURFACE")
+print("=" * 90)
+
+def rolling_lag_correlation_surface(driver, target, max_lag, windows):
+    """Rolling-window correlation (n_windows × n_lags × n_days) from prefix sums; windows not fully observed are NaN"""
+    x = standardize_series(np.asarray(driver, dtype=float))
+    y = standardize_series(np.asarray(target, dtype=float))
+    n = len(y)
+    lags = np.arange(-max_lag, max_lag + 1)
+    
+    # Row k pairs driver[t + k] with target[t]; pairs falling outside the series are masked out
+    driver_day = np.arange(n)[None, :] + lags[:, None]
+    observed = (driver_day >= 0) & (driver_day < n)
+    x_lagged = np.where(observed, x[np.clip(driver_day, 0, n - 1)], 0.0)
+    y_lagged = np.where(observed, y[None, :], 0.0)
+    
+    def _prefix(values):
+        return np.concatenate([np.zeros((len(lags), 1)), np.cumsum(values, axis=1)], axis=1)
+    prefix_n, prefix_x, prefix_y = _prefix(observed.astype(float)), _prefix(x_lagged), _prefix(y_lagged)
+    prefix_xx, prefix_yy, prefix_xy = _prefix(x_lagged ** 2), _prefix(y_lagged ** 2), _prefix(x_lagged * y_lagged)
+    
+    surface = np.full((len(windows), len(lags), n), np.nan)
+    for window_idx, window in enumerate(windows):
+        if window > n:
+            continue
+        end = np.arange(window, n + 1)
+        def _window_sum(prefix):
+            return prefix[:, end] - prefix[:, end - window]
+        count = _window_sum(prefix_n)
+        sum_x, sum_y = _window_sum(prefix_x), _window_sum(prefix_y)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = _window_sum(prefix_xy) - sum_x * sum_y / window
+            var_x = np.maximum(_window_sum(prefix_xx) - sum_x ** 2 / window, 0)
+            var_y = np.maximum(_window_sum(prefix_yy) - sum_y ** 2 / window, 0)
+            corr = np.clip(cov / np.sqrt(var_x * var_y), -1.0, 1.0)
+        surface[window_idx, :, window - 1:] = np.where(count == window, corr, np.nan)
+    return surface
+
+rolling_windows = [7, 14, 28]
+lead_lag_surface = rolling_lag_correlation_surface(
+    daily_ops_ts['update_volume'], daily_ops_ts['operational_load'], max_lag, rolling_windows)
+
+# Strongest lag per window end day, as a tidy table for plotting or thresholding
+_surface_strength = np.where(np.isnan(lead_lag_surface), -1.0, np.abs(lead_lag_surface))
+_surface_best = np.argmax(_surface_strength, axis=1)
+rolling_best_lag = pd.DataFrame({
+    'window_days': np.repeat(rolling_windows, len(daily_ops_ts)),
+    'Date': np.tile(daily_ops_ts['Date'].to_numpy(), len(rolling_windows)),
+    'best_lag_days': lag_values[_surface_best].ravel(),
+    'correlation': np.take_along_axis(lead_lag_surface, _surface_best[:, None, :], axis=1)[:, 0, :].ravel()
+}).dropna(subset=['correlation'])
+
+print(f"\nSurface shape (windows × lags × days): {lead_lag_surface.shape}")
+for window in rolling_windows:
+    window_best = rolling_best_lag[rolling_best_lag['window_days'] == window]
+    if len(window_best) == 0:
+        print(f"  {window}-day window: series too short")
+        continue
+    leading_share = (window_best['best_lag_days'] < 0).mean() * 100
+    print(f"  {window}-day window: {len(window_best)} windows, updates lead load in {leading_share:.1f}% of them, "
+          f"strongest-lag r ranges {window_best['correlation'].min():+.3f} to {window_best['correlation'].max():+.3f}")
+
+# Regional lead-lag: do update surges in one region precede load in another?
 print(f"\n" + "=" * 90)
-print("PREDICTIVE VALUE ANALYSIS")
+print("REGIONAL LEAD-LAG MATRIX")
 print("=" * 90)
 
-# Simple lagged regression to test if updates predict future load
-if len(daily_ops_ts) > 7:
-    # Create lagged features
-    for i in [1, 2, 3, 7]:
-        daily_ops_ts[f'update_lag_{i}'] = daily_ops_ts['update_volume'].shift(i)
-    
-    # Drop NaN values
-    regression_data = daily_ops_ts.dropna()
-    
-    if len(regression_data) > 10:
-        # Calculate simple correlation of lagged updates with current load
-        lag_predictive = []
-        for i in [1, 2, 3, 7]:
-            if f'update_lag_{i}' in regression_data.columns:
-                corr, p = stats.pearsonr(
-                    regression_data[f'update_lag_{i}'], 
-                    regression_data['operational_load']
-                )
-                lag_predictive.append({
-                    'lag': i,
-                    'correlation': corr,
-                    'p_value': p
-                })
+lead_lag_fdr = 0.05  # False discovery rate for regional pair screening
+
+def regional_lead_lag_matrix(driver_panel, target_panel, max_lag, tile_size=None, n_workers=1):
+    """Best lag, correlation and p-value for every (driver region, target region) pair, evaluated in memory-bounded tiles"""
+    driver_panel = np.asarray(driver_panel, dtype=float)
+    target_panel = np.asarray(target_panel, dtype=float)
+    n_drivers, n_targets = driver_panel.shape[0], target_panel.shape[0]
+    tile_size = tile_size or max(n_drivers, n_targets, 1)
+    
+    best_corr = np.full((n_drivers, n_targets), np.nan)
+    best_p = np.full((n_drivers, n_targets), np.nan)
+    best_lag = np.zeros((n_drivers, n_targets), dtype=int)
+    
+    tiles = [(d0, t0) for d0 in range(0, n_drivers, tile_size) for t0 in range(0, n_targets, tile_size)]
+    
+    def _evaluate_tile(tile_idx):
+        d0, t0 = tiles[tile_idx]
+        d1, t1 = min(d0 + tile_size, n_drivers), min(t0 + tile_size, n_targets)
+        corr, p_value, _, lags = lagged_correlations(driver_panel[d0:d1, None, :], target_panel[None, t0:t1, :], max_lag)
+        strongest = np.argmax(np.where(np.isnan(corr), -1.0, np.abs(corr)), axis=-1)[..., None]
+        best_corr[d0:d1, t0:t1] = np.take_along_axis(corr, strongest, axis=-1)[..., 0]
+        best_p[d0:d1, t0:t1] = np.take_along_axis(p_value, strongest, axis=-1)[..., 0]
+        best_lag[d0:d1, t0:t1] = lags[strongest[..., 0]]
+    
+    run_in_chunks(_evaluate_tile, len(tiles), 1, n_workers)
+    return best_corr, best_lag, best_p
+
+def benjamini_hochberg(p_values):
+    """Benjamini-Hochberg q-values; NaN p-values stay NaN and do not count as tests"""
+    p_values = np.asarray(p_values, dtype=float)
+    q_values = np.full(p_values.shape, np.nan)
+    tested = np.flatnonzero(~np.isnan(p_values))
+    order = tested[np.argsort(p_values[tested], kind='stable')]
+    scaled = p_values[order] * len(order) / np.arange(1, len(order) + 1)
+    q_values[order] = np.minimum(1.0, np.minimum.accumulate(scaled[::-1])[::-1])
+    return q_values
+
+def lead_lag_pairs(labels, best_corr, best_lag, best_p, n_lags):
+    """Long table of cross-region pairs, strongest correlation first, with q-values over lags × pairs"""
+    labels = np.asarray(labels)
+    driver_idx, target_idx = np.nonzero(~np.eye(len(labels), dtype=bool))
+    pairs = pd.DataFrame({
+        'leader_idx': driver_idx,
+        'follower_idx': target_idx,
+        'leader': labels[driver_idx],
+        'follower': labels[target_idx],
+        'best_lag_days': best_lag[driver_idx, target_idx],
+        'correlation': best_corr[driver_idx, target_idx],
+        'p_value': best_p[driver_idx, target_idx]
+    })
+    # The best of n_lags lags is Bonferroni-adjusted within each pair, then FDR-controlled across pairs
+    pairs['q_value'] = benjamini_hochberg(np.minimum(1.0, pairs['p_value'].to_numpy() * n_lags))
+    return pairs.sort_values('correlation', ascending=False, key=abs).reset_index(drop=True)
+
+def confirm_leading_pairs(pairs, driver_panel, target_panel, max_lag, fdr=lead_lag_fdr,
+                          confidence=bootstrap_confidence, n_workers=1):
+    """Leading pairs that pass the FDR screen and whose block-bootstrap interval at the best lag excludes 0"""
+    candidates = pairs[(pairs['best_lag_days'] < 0) & (pairs['q_value'] < fdr)].copy()
+    candidates['ci_lower'] = np.nan
+    candidates['ci_upper'] = np.nan
+    # Pairs sharing a follower are resampled together against that follower's series
+    for follower_idx, group in candidates.groupby('follower_idx'):
+        boot = block_bootstrap_correlations(driver_panel[group['leader_idx'].to_numpy()], target_panel[follower_idx],
+                                            max_lag, n_workers=n_workers)
+        at_best_lag = boot[np.arange(len(group)), group['best_lag_days'].to_numpy() + max_lag]
+        candidates.loc[group.index, 'ci_lower'] = np.nanpercentile(at_best_lag, 100 * (1 - confidence) / 2, axis=-1)
+        candidates.loc[group.index, 'ci_upper'] = np.nanpercentile(at_best_lag, 100 * (1 + confidence) / 2, axis=-1)
+    return candidates[(candidates['ci_lower'] > 0) | (candidates['ci_upper'] < 0)]
+
+district_tile_size = 64  # Bounds each district tile to 64 × 64 pairs
+
+# All states: state update volume vs state operational load
+state_update_panel = state_daily_demo_updates + state_daily_bio_updates
+state_lead_lag_corr, state_lead_lag_best_lag, state_lead_lag_p = regional_lead_lag_matrix(
+    state_update_panel, state_daily_operations, max_lag, n_workers=lead_lag_workers)
+state_lead_lag_pairs = lead_lag_pairs(panel_states, state_lead_lag_corr, state_lead_lag_best_lag, state_lead_lag_p,
+                                      len(lag_values))
+state_leading_pairs = confirm_leading_pairs(state_lead_lag_pairs, state_update_panel, state_daily_operations, max_lag,
+                                            n_workers=lead_lag_workers)
+print(f"\n🗺️ STATE × STATE ({len(panel_states)} states, lags {-max_lag} to +{max_lag} days):")
+print(f"  Leading pairs passing FDR {lead_lag_fdr:.0%} over {len(lag_values)} lags × {len(state_lead_lag_pairs)} pairs: "
+      f"{((state_lead_lag_pairs['best_lag_days'] < 0) & (state_lead_lag_pairs['q_value'] < lead_lag_fdr)).sum()}")
+print(f"  Of these, confirmed by block-bootstrap {bootstrap_confidence:.0%} CI at the best lag: {len(state_leading_pairs)}")
+for _, pair in state_leading_pairs.head(10).iterrows():
+    print(f"  {pair['leader']} → {pair['follower']}: lead {abs(pair['best_lag_days'])} days, r={pair['correlation']:+.4f}, "
+          f"q={pair['q_value']:.4f}, CI=[{pair['ci_lower']:+.4f}, {pair['ci_upper']:+.4f}]")
+
+# Districts within the highest-update state, tiled to keep memory bounded
+lead_lag_focus_state = panel_states[np.argmax(state_update_panel.sum(axis=1))]
+focus_districts = np.flatnonzero(panel_districts['state'].to_numpy() == lead_lag_focus_state)
+district_lead_lag_corr, district_lead_lag_best_lag, district_lead_lag_p = regional_lead_lag_matrix(
+    district_daily_demo_updates[focus_districts] + district_daily_bio_updates[focus_districts],
+    district_daily_operations[focus_districts], max_lag, tile_size=district_tile_size, n_workers=lead_lag_workers)
+district_lead_lag_pairs = lead_lag_pairs(panel_districts['district'].to_numpy()[focus_districts],
+                                         district_lead_lag_corr, district_lead_lag_best_lag, district_lead_lag_p,
+                                         len(lag_values))
+district_leading_pairs = confirm_leading_pairs(
+    district_lead_lag_pairs, district_daily_demo_updates[focus_districts] + district_daily_bio_updates[focus_districts],
+    district_daily_operations[focus_districts], max_lag, n_workers=lead_lag_workers)
+print(f"\n🏘️ DISTRICT × DISTRICT in {lead_lag_focus_state} ({len(focus_districts)} districts):")
+print(f"  Leading pairs passing FDR {lead_lag_fdr:.0%} and confirmed by block bootstrap: {len(district_leading_pairs)}")
+for _, pair in district_leading_pairs.head(10).iterrows():
+    print(f"  {pair['leader']} → {pair['follower']}: lead {abs(pair['best_lag_days'])} days, r={pair['correlation']:+.4f}, "
+          f"q={pair['q_value']:.4f}, CI=[{pair['ci_lower']:+.4f}, {pair['ci_upper']:+.4f}]")
+
+# Granger causality: do past updates improve a prediction of load beyond load's own history?
+print(f"\n" + "=" * 90)
+print("PREDICTIVE VALUE ANALYSIS (GRANGER CAUSALITY)")
+print("=" * 90)
+
+granger_rank_tol = 1e-8  # |diag(R)| below this fraction of the largest pivot counts as collinear
+
+def granger_causality(drivers, targets, lag_orders):
+    """Granger (f_stat, p_value), each (n_pairs × n_orders), of drivers[b] → targets[b]; rank-deficient designs give NaN"""
+    drivers = np.atleast_2d(np.asarray(drivers, dtype=float))
+    targets = np.atleast_2d(np.asarray(targets, dtype=float))
+    # The F-test is invariant to rescaling either series; standardising keeps the QR well conditioned
+    drivers = standardize_series(drivers)
+    targets = standardize_series(targets)
+    n_pairs, n_days = targets.shape
+    
+    f_stat = np.full((n_pairs, len(lag_orders)), np.nan)
+    p_value = np.full((n_pairs, len(lag_orders)), np.nan)
+    for order_idx, order in enumerate(lag_orders):
+        n_obs = n_days - order
+        df_den = n_obs - 2 * order - 1
+        if df_den <= 0:
+            continue
+        # Windows of order + 1 days: last column is y_t, the rest are its lags
+        target_windows = np.lib.stride_tricks.sliding_window_view(targets, order + 1, axis=1)
+        driver_windows = np.lib.stride_tricks.sliding_window_view(drivers, order + 1, axis=1)
+        current = target_windows[:, :, -1]
+        intercept = np.ones((n_pairs, n_obs, 1))
+        restricted = np.concatenate([intercept, target_windows[:, :, :-1]], axis=2)
+        unrestricted = np.concatenate([restricted, driver_windows[:, :, :-1]], axis=2)
         
-        predictive_df = pd.DataFrame(lag_predictive)
-        print(f"\nPredictive power of past updates on current operational load:")
-        for _, row in predictive_df.iterrows():
-            sig = "✓" if row['p_value'] < 0.05 else "✗"
-            print(f"  {row['lag']}-day lag: r={row['correlation']:+.4f}, p={row['p_value']:.6f} {sig}")
+        def _rss(design):
+            q, r = np.linalg.qr(design)
+            # A constant or all-zero series (sparse regions) makes the design rank deficient
+            r_diag = np.abs(np.diagonal(r, axis1=1, axis2=2))
+            full_rank = (r_diag > granger_rank_tol * r_diag.max(axis=1, keepdims=True)).all(axis=1)
+            projected = np.einsum('btk,bt->bk', q, current)
+            return np.maximum((current ** 2).sum(axis=1) - (projected ** 2).sum(axis=1), 0), full_rank
+        (rss_restricted, restricted_ok), (rss_unrestricted, unrestricted_ok) = _rss(restricted), _rss(unrestricted)
+        testable = restricted_ok & unrestricted_ok & (rss_unrestricted > 0)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            order_f = ((rss_restricted - rss_unrestricted) / order) / (rss_unrestricted / df_den)
+        f_stat[testable, order_idx] = order_f[testable]
+        p_value[testable, order_idx] = stats.f.sf(order_f[testable], order, df_den)
+    return f_stat, p_value
+
+granger_lag_orders = [1, 2, 3, 7]
+
+# National: each update series against operational load
+national_granger_f, national_granger_p = granger_causality(
+    driver_matrix, np.broadcast_to(load_series, driver_matrix.shape), granger_lag_orders)
+predictive_df = pd.DataFrame({
+    'driver': np.repeat(lead_lag_drivers, len(granger_lag_orders)),
+    'lag': np.tile(granger_lag_orders, len(lead_lag_drivers)),
+    'f_statistic': national_granger_f.ravel(),
+    'p_value': national_granger_p.ravel()
+})
+predictive_df['significant'] = predictive_df['p_value'] < 0.05
+
+print(f"\nDo past updates Granger-cause current operational load?")
+for driver_name in lead_lag_drivers:
+    print(f"\n  {driver_name}:")
+    for _, row in predictive_df[predictive_df['driver'] == driver_name].iterrows():
+        sig = "✓" if row['significant'] else "✗"
+        print(f"    {row['lag']}-day lag order: F={row['f_statistic']:.3f}, p={row['p_value']:.6f} {sig}")
+
+# Regional: every ordered state pair (updates in one state → load in another) in one batch
+granger_driver_idx, granger_target_idx = np.nonzero(~np.eye(len(panel_states), dtype=bool))
+state_granger_f, state_granger_p = granger_causality(
+    state_update_panel[granger_driver_idx], state_daily_operations[granger_target_idx], granger_lag_orders)
+state_granger_df = pd.DataFrame({
+    'leader': np.repeat(panel_states[granger_driver_idx], len(granger_lag_orders)),
+    'follower': np.repeat(panel_states[granger_target_idx], len(granger_lag_orders)),
+    'lag': np.tile(granger_lag_orders, len(granger_driver_idx)),
+    'f_statistic': state_granger_f.ravel(),
+    'p_value': state_granger_p.ravel()
+}).sort_values('f_statistic', ascending=False, na_position='last').reset_index(drop=True)
+
+state_granger_significant = state_granger_df[state_granger_df['p_value'] < 0.05]
+print(f"\n🗺️ STATE-PAIR GRANGER TESTS: {len(granger_driver_idx)} pairs × {len(granger_lag_orders)} lag orders")
+print(f"  Significant (p < 0.05): {len(state_granger_significant)} of {len(state_granger_df)}")
+if state_granger_df['f_statistic'].isna().any():
+    print(f"  Untestable (constant or collinear series): {state_granger_df['f_statistic'].isna().sum()}")
+for _, row in state_granger_significant.head(10).iterrows():
+    print(f"  {row['leader']} → {row['follower']} (lag order {row['lag']}): F={row['f_statistic']:.2f}, p={row['p_value']:.6f}")
 
 print(f"\n✅ Lead-lag analysis complete")
 print(f"   - Cross-correlation performed across {-max_lag} to +{max_lag} day lags")
+print(f"   - Moving-block bootstrap confidence intervals per lag")
 print(f"   - Separate analysis for demographic and biometric updates")
-print(f"   - Predictive value quantified for operational planning")
+print(f"   - Rolling lead-lag surface across {len(rolling_windows)} window lengths")
+print(f"   - State × state and district × district lead-lag matrices computed")
+print(f"   - Granger causality tested nationally and across state pairs")
@@ -1,9 +1,105 @@
 import pandas as pd
 import numpy as np
+from scipy import stats
 
 # Regional measures for state and district levels
 # Calculate enrolment, update volumes, ratios, and stress scores
 
+# --- EMPIRICAL-BAYES STRESS SCORES ---
+# Raw update/enrolment ratios explode for regions with tiny enrolment counts. Log ratios are shrunk
+# towards a prior fitted across all regions of a level, weighted by how noisy each region's ratio is.
+stress_credible_level = 0.95
+stress_min_prior_sd = 0.01  # Floor on the between-region spread of log ratios, so the prior never collapses to one point
+
+def fit_count_dispersion(region_day_counts):
+    """Negative-binomial α (Var = μ + αμ²) of region-day counts around national day share × region total"""
+    counts = np.asarray(region_day_counts, dtype=float)
+    # Expected counts follow the national daily profile, so demand swings shared by every region are not noise
+    expected = counts.sum(axis=1, keepdims=True) * counts.sum(axis=0) / max(counts.sum(), 1.0)
+    alpha = np.sum((counts - expected) ** 2 - counts) / max(np.sum(expected ** 2), 1e-12)
+    return max(0.0, alpha), expected
+
+def daily_ratio_sampling_variance(region_cols):
+    """Sampling variance of each region's log(updates / enrolments) under overdispersed day counts"""
+    enrolment_days = unified_enrolment[['age_0_5', 'age_5_17', 'age_18_greater']].sum(axis=1).groupby(
+        [unified_enrolment[col] for col in region_cols] + [unified_enrolment['Date']]).sum()
+    update_days = pd.concat([
+        unified_demographic[['demo_age_5_17', 'demo_age_17_']].sum(axis=1).groupby(
+            [unified_demographic[col] for col in region_cols] + [unified_demographic['Date']]).sum(),
+        unified_biometric[['bio_age_5_17', 'bio_age_17_']].sum(axis=1).groupby(
+            [unified_biometric[col] for col in region_cols] + [unified_biometric['Date']]).sum()
+    ], axis=1).sum(axis=1)
+    days = pd.DataFrame({'e': enrolment_days, 'u': update_days}).fillna(0)
+    dispersion = {}
+    variance = 0
+    for col in ['e', 'u']:
+        # Region × date grid; a day a region did not report counts as zero
+        region_days = days[col].unstack(-1, fill_value=0)
+        dispersion[col], expected = fit_count_dispersion(region_days)
+        # Var(total) = Σ μ + α Σ μ², so large regions keep the batch noise a flat φ / total would shrink away
+        totals = region_days.sum(axis=1)
+        variance = variance + (totals + dispersion[col] * np.sum(expected ** 2, axis=1)) / (totals + 0.5) ** 2
+    variance.index = variance.index.set_names(region_cols)
+    return variance, dispersion
+
+def shrink_log_ratios(updates, enrolments, sampling_var, credible_level=stress_credible_level):
+    """Normal-normal empirical-Bayes posterior for log ratios, with a DerSimonian-Laird prior, in one vectorised pass"""
+    log_ratio = np.log((np.asarray(updates, dtype=float) + 0.5) / (np.asarray(enrolments, dtype=float) + 0.5))
+    sampling_var = np.asarray(sampling_var, dtype=float)
+    weights = 1 / sampling_var
+    fixed_mean = np.sum(weights * log_ratio) / weights.sum()
+    q_stat = np.sum(weights * (log_ratio - fixed_mean) ** 2)
+    moment_prior_var = (q_stat - (len(log_ratio) - 1)) / (weights.sum() - np.sum(weights ** 2) / weights.sum())
+    prior_var = max(stress_min_prior_sd ** 2, moment_prior_var)
+    prior_weights = 1 / (sampling_var + prior_var)
+    prior_mean = np.sum(prior_weights * log_ratio) / prior_weights.sum()
+    shrinkage = sampling_var / (sampling_var + prior_var)
+    posterior_mean = prior_mean + (1 - shrinkage) * (log_ratio - prior_mean)
+    # Morris correction: heavily shrunk regions inherit the uncertainty of the fitted prior mean
+    posterior_sd = np.sqrt((1 - shrinkage) * sampling_var + shrinkage ** 2 / prior_weights.sum())
+    z = stats.norm.ppf(0.5 + credible_level / 2)
+    return (np.exp(posterior_mean), np.exp(posterior_mean - z * posterior_sd),
+            np.exp(posterior_mean + z * posterior_sd), shrinkage), moment_prior_var
+
+def add_shrunk_stress_scores(metrics, region_cols):
+    """Posterior stress score, interval and rank for regions with enrolments, plus the fitted noise and prior terms"""
+    sampling_var, stress_fit = daily_ratio_sampling_variance(region_cols)
+    sampling_var = sampling_var.reindex(
+        pd.MultiIndex.from_frame(metrics[region_cols]) if len(region_cols) > 1 else metrics[region_cols[0]])
+    has_enrolments = (metrics['total_enrolments'] > 0).to_numpy() & sampling_var.notna().to_numpy()
+    for col in ['stress_score', 'stress_ci_lower', 'stress_ci_upper', 'stress_shrinkage']:
+        metrics[col] = np.nan
+    posterior, stress_fit['prior_var'] = shrink_log_ratios(
+        metrics.loc[has_enrolments, 'total_updates'], metrics.loc[has_enrolments, 'total_enrolments'],
+        sampling_var.to_numpy()[has_enrolments])
+    metrics.loc[has_enrolments, ['stress_score', 'stress_ci_lower', 'stress_ci_upper', 'stress_shrinkage']] = np.column_stack(posterior)
+    metrics['stress_rank'] = metrics['stress_score'].rank(ascending=False, method='dense')
+    return metrics, stress_fit
+
+def small_denominator_check(metrics, top_n=10, small_quantile=0.1):
+    """Counts of bottom-decile enrolment regions in the top N by raw ratio and by shrunk stress score"""
+    scored = metrics[metrics['stress_score'].notna()]
+    small = scored['total_enrolments'] <= scored['total_enrolments'].quantile(small_quantile)
+    raw_top = scored['updates_to_enrolment_ratio'].nlargest(top_n).index
+    shrunk_top = scored['stress_score'].nlargest(top_n).index
+    return int(small[raw_top].sum()), int(small[shrunk_top].sum())
+
+def print_small_denominator_check(metrics, stress_fit, top_n=10):
+    """Print the fitted noise and prior terms and check that shrinkage neither promotes small regions nor ties them all"""
+    raw_small, shrunk_small = small_denominator_check(metrics, top_n)
+    print(f"Day-count overdispersion (Var = μ + αμ²): enrolments α={stress_fit['e']:.3f}, updates α={stress_fit['u']:.3f}")
+    print(f"Between-region prior sd of log ratio: {np.sqrt(max(stress_fit['prior_var'], 0)):.3f} "
+          f"(floor {stress_min_prior_sd})")
+    if stress_fit['prior_var'] <= stress_min_prior_sd ** 2:
+        print("⚠️ Observed spread is within sampling noise; the floored prior keeps scores near-pooled")
+    print(f"Bottom-decile enrolment regions in top {top_n}: raw ratio {raw_small} → shrunk {shrunk_small}")
+    if shrunk_small > raw_small:
+        print("⚠️ Shrinkage moved small-denominator regions up the ranking")
+    _scored = metrics['stress_rank'].dropna()
+    print(f"Distinct stress ranks: {_scored.nunique()} of {len(_scored)} scored regions")
+    if len(_scored) > 1 and _scored.nunique() == 1:
+        print("⚠️ Every region shares one stress rank")
+
 # --- STATE-LEVEL ANALYSIS ---
 # Enrolments by state
 state_enrolment = unified_enrolment.groupby('state').agg({
@@ -37,9 +133,8 @@ state_metrics['demo_to_enrolment_ratio'] = state_metrics['total_demo_updates'] /
 state_metrics['bio_to_enrolment_ratio'] = state_metrics['total_bio_updates'] / state_metrics['total_enrolments'].replace(0, np.nan)
 state_metrics['updates_to_enrolment_ratio'] = state_metrics['total_updates'] / state_metrics['total_enrolments'].replace(0, np.nan)
 
-# Calculate state stress score (higher ratio = higher stress)
-state_metrics['stress_score'] = state_metrics['updates_to_enrolment_ratio']
-state_metrics['stress_rank'] = state_metrics['stress_score'].rank(ascending=False, method='dense')
+# Calculate state stress score (higher ratio = higher stress), shrunk towards the all-state prior
+state_metrics, state_stress_fit = add_shrunk_stress_scores(state_metrics, ['state'])
 
 # State rankings by volume
 state_metrics['enrolment_rank'] = state_metrics['total_enrolments'].rank(ascending=False, method='dense')
@@ -51,8 +146,9 @@ print(f"\nTop 10 States by Enrolment Volume:")
 print(state_metrics.nlargest(10, 'total_enrolments')[['state', 'total_enrolments', 'enrolment_rank']].to_string(index=False))
 print(f"\nTop 10 States by Update Volume:")
 print(state_metrics.nlargest(10, 'total_updates')[['state', 'total_updates', 'update_rank']].to_string(index=False))
-print(f"\nTop 10 States by Stress Score (Updates/Enrolment Ratio):")
-print(state_metrics.nlargest(10, 'stress_score')[['state', 'stress_score', 'updates_to_enrolment_ratio', 'stress_rank']].to_string(index=False))
+print(f"\nTop 10 States by Stress Score (Empirical-Bayes Updates/Enrolment Ratio, {stress_credible_level:.0%} interval):")
+print(state_metrics.nlargest(10, 'stress_score')[['state', 'stress_score', 'stress_ci_lower', 'stress_ci_upper', 'updates_to_enrolment_ratio', 'stress_rank']].to_string(index=False))
+print_small_denominator_check(state_metrics, state_stress_fit)
 
 # --- DISTRICT-LEVEL ANALYSIS ---
 # Enrolments by district
@@ -87,9 +183,8 @@ district_metrics['demo_to_enrolment_ratio'] = district_metrics['total_demo_updat
 district_metrics['bio_to_enrolment_ratio'] = district_metrics['total_bio_updates'] / district_metrics['total_enrolments'].replace(0, np.nan)
 district_metrics['updates_to_enrolment_ratio'] = district_metrics['total_updates'] / district_metrics['total_enrolments'].replace(0, np.nan)
 
-# Calculate district stress score
-district_metrics['stress_score'] = district_metrics['updates_to_enrolment_ratio']
-district_metrics['stress_rank'] = district_metrics['stress_score'].rank(ascending=False, method='dense')
+# Calculate district stress score, shrunk towards the all-district prior
+district_metrics, district_stress_fit = add_shrunk_stress_scores(district_metrics, ['state', 'district'])
 
 # District rankings by volume
 district_metrics['enrolment_rank'] = district_metrics['total_enrolments'].rank(ascending=False, method='dense')
@@ -101,7 +196,8 @@ print(f"\nTop 10 Districts by Enrolment Volume:")
 print(district_metrics.nlargest(10, 'total_enrolments')[['state', 'district', 'total_enrolments', 'enrolment_rank']].to_string(index=False))
 print(f"\nTop 10 Districts by Update Volume:")
 print(district_metrics.nlargest(10, 'total_updates')[['state', 'district', 'total_updates', 'update_rank']].to_string(index=False))
-print(f"\nTop 10 Districts by Stress Score (Updates/Enrolment Ratio):")
-print(district_metrics.nlargest(10, 'stress_score')[['state', 'district', 'stress_score', 'updates_to_enrolment_ratio', 'stress_rank']].to_string(index=False))
+print(f"\nTop 10 Districts by Stress Score (Empirical-Bayes Updates/Enrolment Ratio, {stress_credible_level:.0%} interval):")
+print(district_metrics.nlargest(10, 'stress_score')[['state', 'district', 'stress_score', 'stress_ci_lower', 'stress_ci_upper', 'updates_to_enrolment_ratio', 'stress_rank']].to_string(index=False))
+print_small_denominator_check(district_metrics, district_stress_fit)
 
 print("\n✓ Regional measures computed: state/district rankings, volumes, ratios, and stress scores created")
@@ -1,3 +1,4 @@
+import os
 import pandas as pd
 import numpy as np
 import warnings
@@ -37,41 +38,148 @@ print(f"  - Forecast uncertainty increases with horizon")
 # Simple exponential smoothing with trend
 from scipy.ndimage import uniform_filter1d
 
-# Calculate smoothing parameters
-alpha = 0.3  # Level smoothing
-beta = 0.1   # Trend smoothing
-
+def exponential_smoothing_step(state, new_values):
+    """Advance every run's smoothing state by one day in place; returns the one-step-ahead forecasts for new_values"""
+    rows = np.arange(len(state['level']))
+    phase = state['n_days'] % np.maximum(state['period'], 1)
+    prior_season = state['season'][rows, phase]
+    damped_trend = state['phi'] * state['trend']
+    one_step = state['level'] + damped_trend + prior_season
+    alpha, beta, gamma = state['alpha'], state['beta'], state['gamma']
+    new_level = alpha * (new_values - prior_season) + (1 - alpha) * (state['level'] + damped_trend)
+    state['trend'] = beta * (new_level - state['level']) + (1 - beta) * damped_trend
+    state['season'][rows, phase] = gamma * (new_values - new_level) + (1 - gamma) * prior_season
+    state['level'] = new_level
+    state['n_days'] = state['n_days'] + 1
+    return one_step
+
+def exponential_smoothing_filter(values, alpha, beta, phi=1.0, gamma=0.0, period=0, snapshot_days=None):
+    """Additive damped-trend Holt-Winters over many runs at once (period 0 = no season); returns state, level path and one-step fits"""
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    n_runs, n_days = values.shape
+    alpha, beta, phi, gamma, period = (np.broadcast_to(np.asarray(param, dtype=float), (n_runs,)).copy()
+                                       for param in (alpha, beta, phi, gamma, period))
+    period = period.astype(int)
+    state = {
+        'level': values[:, 0].copy(),
+        'trend': np.zeros(n_runs),
+        'season': np.zeros((n_runs, max(period.max(), 1))),
+        'alpha': alpha, 'beta': beta, 'phi': phi,
+        'gamma': np.where(period > 0, gamma, 0.0),
+        'period': period,
+        'n_days': 1
+    }
+    level_path = np.empty((n_runs, n_days))
+    one_step = np.empty((n_runs, n_days))
+    level_path[:, 0] = state['level']
+    one_step[:, 0] = state['level']
+    
+    snapshot_days = [] if snapshot_days is None else list(snapshot_days)
+    snapshots = {'level': [], 'trend': [], 'season': []}
+    def _take_snapshot():
+        for key in snapshots:
+            snapshots[key].append(state[key].copy())
+    if 0 in snapshot_days:
+        _take_snapshot()
+    
+    for t in range(1, n_days):
+        one_step[:, t] = exponential_smoothing_step(state, values[:, t])
+        level_path[:, t] = state['level']
+        if t in snapshot_days:
+            _take_snapshot()
+    
+    if snapshot_days:
+        n_snapshots = len(snapshots['level'])
+        state['snapshots'] = {
+            'level': np.concatenate(snapshots['level']),
+            'trend': np.concatenate(snapshots['trend']),
+            'season': np.concatenate(snapshots['season']),
+            'phi': np.tile(phi, n_snapshots),
+            'period': np.tile(period, n_snapshots),
+            'n_days': np.repeat(np.asarray(sorted(snapshot_days)) + 1, n_runs)
+        }
+    return state, level_path, one_step
+
+def exponential_smoothing_forecast(state, horizon):
+    """h-step forecasts (n_runs × horizon) from a fitted smoothing state"""
+    steps = np.arange(1, horizon + 1)
+    phi = state['phi'][:, None]
+    # Cumulative damping: phi + phi^2 + ... + phi^h (equals h when phi = 1)
+    damping = np.cumsum(phi ** steps[None, :], axis=1)
+    season_length = np.maximum(state['period'], 1)[:, None]
+    phase = (np.reshape(state['n_days'], (-1, 1)) - 1 + steps[None, :]) % season_length
+    seasonal = np.take_along_axis(state['season'], phase, axis=1)
+    return state['level'][:, None] + damping * state['trend'][:, None] + seasonal
+
+def bootstrap_smoothing_paths(values, alpha, beta, phi=1.0, gamma=0.0, period=0, horizon=14, n_paths=1000, seed=42):
+    """Residual-bootstrap sample paths (n_series × n_paths × horizon) fed back through each series' fitted smoothing recursions"""
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    state, _, one_step = exponential_smoothing_filter(values, alpha, beta, phi, gamma, period)
+    return simulate_smoothing_paths(state, (values - one_step)[:, 1:], horizon, n_paths, seed)
+
+def simulate_smoothing_paths(state, errors, horizon=14, n_paths=1000, seed=42):
+    """Sample paths (n_series × n_paths × horizon) feeding resampled one-step errors (n_series × n_errors) through the recursions"""
+    n_series = len(state['level'])
+    rng = np.random.default_rng(seed)
+    draws = errors[np.arange(n_series)[:, None, None], rng.integers(0, errors.shape[1], (n_series, n_paths, horizon))]
+    
+    path_state = {key: np.repeat(state[key], n_paths, axis=0)
+                  for key in ['level', 'trend', 'season', 'alpha', 'beta', 'gamma', 'phi', 'period']}
+    path_state['n_days'] = np.repeat(np.broadcast_to(state['n_days'], (n_series,)), n_paths)
+    paths = np.empty((n_series * n_paths, horizon))
+    for h in range(horizon):
+        step_forecast = exponential_smoothing_forecast(path_state, 1)[:, 0]
+        paths[:, h] = np.maximum(0, step_forecast + draws[:, :, h].ravel())
+        exponential_smoothing_step(path_state, paths[:, h])
+    return paths.reshape(n_series, n_paths, horizon)
+
+def bootstrap_intervals(paths, confidence=0.95):
+    """Empirical (lower, upper) quantiles across the path axis of (n_series × n_paths × horizon) paths"""
+    tail = (1 - confidence) / 2
+    lower, upper = np.quantile(paths, [tail, 1 - tail], axis=1)
+    return lower, upper
+
+# Batched parameter search: every setting is smoothed in one pass and scored on the
+# last 7 training days, then the winner is refit on the full training window
+from itertools import product
+# A 7-row season is only a week when every row is the next calendar day; sparse reported dates get no seasonal term
+seasonal_calendar_axis = bool((forecast_data['Date'].diff().iloc[1:] == pd.Timedelta(days=1)).all())
+seasonal_periods = [0, 7] if seasonal_calendar_axis else [0]
+smoothing_settings = []
+for _grid_alpha, _grid_beta, _grid_phi, _grid_period in product(np.round(np.arange(0.05, 1.0, 0.05), 2),
+                                                                 [0.01, 0.05, 0.1, 0.2, 0.3],
+                                                                 [0.8, 0.9, 0.98, 1.0], seasonal_periods):
+    for _grid_gamma in ([0.05, 0.1, 0.3] if _grid_period > 0 else [0.0]):
+        smoothing_settings.append((_grid_alpha, _grid_beta, _grid_phi, _grid_gamma, _grid_period))
+smoothing_grid = pd.DataFrame(smoothing_settings, columns=['alpha', 'beta', 'phi', 'gamma', 'period'])
+validation_days = 7
 train_values = train_data['total_operations'].values
-smoothed_level = [train_values[0]]
-smoothed_trend = [0]
-
-for _smooth_i in range(1, len(train_values)):
-    level = alpha * train_values[_smooth_i] + (1 - alpha) * (smoothed_level[-1] + smoothed_trend[-1])
-    trend = beta * (level - smoothed_level[-1]) + (1 - beta) * smoothed_trend[-1]
-    smoothed_level.append(level)
-    smoothed_trend.append(trend)
+tuning_values = np.broadcast_to(train_values[:-validation_days], (len(smoothing_grid), len(train_values) - validation_days))
+tuning_state, _, _ = exponential_smoothing_filter(
+    tuning_values, smoothing_grid['alpha'], smoothing_grid['beta'], smoothing_grid['phi'],
+    smoothing_grid['gamma'], smoothing_grid['period'])
+validation_forecast = np.maximum(0, exponential_smoothing_forecast(tuning_state, validation_days))
+smoothing_grid['validation_mae'] = np.mean(np.abs(validation_forecast - train_values[-validation_days:]), axis=1)
+best_smoothing = smoothing_grid.loc[smoothing_grid['validation_mae'].idxmin()]
+
+alpha = best_smoothing['alpha']  # Level smoothing
+beta = best_smoothing['beta']   # Trend smoothing
+phi = best_smoothing['phi']     # Trend damping
+gamma = best_smoothing['gamma']  # Seasonal smoothing
+seasonal_period = int(best_smoothing['period'])
+
+exp_state, exp_level_path, _ = exponential_smoothing_filter(train_values, alpha, beta, phi, gamma, seasonal_period)
+smoothed_level = exp_level_path[0]
 
 # Generate forecasts
 forecast_steps = len(test_data) + 14
-exp_forecast = []
-for h in range(1, forecast_steps + 1):
-    forecast_value = smoothed_level[-1] + h * smoothed_trend[-1]
-    exp_forecast.append(max(0, forecast_value))  # Ensure non-negative
-
-exp_forecast = np.array(exp_forecast)
-
-# Calculate residuals for confidence intervals
-train_fitted = np.array([smoothed_level[_fit_i] for _fit_i in range(len(train_values))])
-residuals = train_values - train_fitted
-residual_std = np.std(residuals)
-
-# Confidence intervals (widen with forecast horizon)
-exp_lower_95 = []
-exp_upper_95 = []
-for h in range(1, forecast_steps + 1):
-    margin = 1.96 * residual_std * np.sqrt(1 + (h / len(train_data)))
-    exp_lower_95.append(max(0, exp_forecast[h-1] - margin))
-    exp_upper_95.append(exp_forecast[h-1] + margin)
+exp_forecast = np.maximum(0, exponential_smoothing_forecast(exp_state, forecast_steps)[0])  # Ensure non-negative
+
+# Simulation-based 95% intervals: residual-bootstrap paths instead of a Gaussian band
+bootstrap_paths = 1000
+exp_paths = bootstrap_smoothing_paths(train_values, alpha, beta, phi, gamma, seasonal_period,
+                                      horizon=forecast_steps, n_paths=bootstrap_paths)
+exp_lower_95, exp_upper_95 = (band[0] for band in bootstrap_intervals(exp_paths))
 
 # Evaluate on test set
 test_exp_pred = exp_forecast[:len(test_data)]
@@ -82,7 +190,10 @@ rmse_exp = np.sqrt(np.mean((test_actual - test_exp_pred)**2))
 mape_exp = np.mean(np.abs((test_actual - test_exp_pred) / (test_actual + 1))) * 100
 
 print(f"\n📊 EXPONENTIAL SMOOTHING VALIDATION (Test Set):")
-print(f"  Smoothing parameters: α={alpha}, β={beta}")
+print(f"  Grid searched: {len(smoothing_grid)} settings (α, β, φ, γ, seasonal period) in one batched pass")
+print(f"  Selected by {validation_days}-day validation MAE: α={alpha}, β={beta}, φ={phi}, γ={gamma}, period={seasonal_period or 'none'}")
+if not seasonal_calendar_axis:
+    print(f"  Weekly seasonality not searched: reported dates skip calendar days, so 7 rows are not a week")
 print(f"  Mean Absolute Error (MAE): {mae_exp:,.0f} operations")
 print(f"  Root Mean Squared Error (RMSE): {rmse_exp:,.0f} operations")
 print(f"  Mean Absolute Percentage Error (MAPE): {mape_exp:.2f}%")
@@ -119,19 +230,48 @@ print(f"  - No strong trend or seasonality components")
 print(f"  - Mean-reverting process")
 print(f"  - Suitable for stable operational patterns")
 
-# Calculate 7-day and 14-day moving averages
-ma_7 = train_data['total_operations'].rolling(window=7, min_periods=1).mean().iloc[-1]
-ma_14 = train_data['total_operations'].rolling(window=14, min_periods=1).mean().iloc[-1]
-ma_21 = train_data['total_operations'].rolling(window=21, min_periods=1).mean().iloc[-1]
-
-# Use weighted average of different windows
-ma_forecast_value = 0.5 * ma_7 + 0.3 * ma_14 + 0.2 * ma_21
+wma_windows = (7, 14, 21)
+wma_weights = (0.5, 0.3, 0.2)
+
+def weighted_moving_average_level(values, windows=wma_windows, weights=wma_weights):
+    """Weighted blend of trailing means (one per row of values) used as a flat forecast level"""
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    n_days = values.shape[1]
+    totals = np.cumsum(values[:, ::-1], axis=1)  # totals[:, k - 1] = sum of the last k days
+    level = np.zeros(values.shape[0])
+    for window, weight in zip(windows, weights):
+        span = min(window, n_days)
+        level += weight * totals[:, span - 1] / span
+    return level
+
+def bootstrap_moving_average_paths(values, horizon=14, n_paths=1000, seed=42, windows=wma_windows, weights=wma_weights):
+    """Per-horizon bootstrap draws (n_series × n_paths × horizon) of historical h-step misses around the flat moving average"""
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    n_series, n_days = values.shape
+    totals = np.concatenate([np.zeros((n_series, 1)), np.cumsum(values, axis=1)], axis=1)
+    days = np.arange(1, n_days)  # Origin j forecasts from days 0..j, i.e. the level after day j
+    trailing_level = np.zeros((n_series, n_days - 1))
+    for window, weight in zip(windows, weights):
+        span = np.minimum(window, days)
+        trailing_level += weight * (totals[:, days] - totals[:, days - span]) / span
+    
+    # Steps are drawn independently: read per-horizon quantiles from the draws, not path sums.
+    # Horizons beyond the history reuse the longest available miss
+    steps = np.minimum(np.arange(1, horizon + 1), n_days - 1)
+    rng = np.random.default_rng(seed)
+    origins = np.floor(rng.random((n_series, n_paths, horizon)) * (n_days - steps)).astype(int)
+    rows = np.arange(n_series)[:, None, None]
+    draws = values[rows, origins + steps] - trailing_level[rows, origins]
+    level = weighted_moving_average_level(values, windows, weights)
+    return np.maximum(0, level[:, None, None] + draws)
+
+# Calculate 7-day, 14-day and 21-day moving averages and use a weighted average of the windows
+ma_forecast_value = weighted_moving_average_level(train_data['total_operations'].values)[0]
 ma_forecast = np.full(forecast_steps, ma_forecast_value)
 
-# Confidence intervals based on recent volatility
-recent_std = train_data['total_operations'].tail(14).std()
-ma_lower_95 = np.maximum(0, ma_forecast - 1.96 * recent_std)
-ma_upper_95 = ma_forecast + 1.96 * recent_std
+# Bootstrap intervals from the moving average's own historical misses
+ma_paths = bootstrap_moving_average_paths(train_values, horizon=forecast_steps, n_paths=bootstrap_paths)
+ma_lower_95, ma_upper_95 = (band[0] for band in bootstrap_intervals(ma_paths))
 
 # Evaluate on test set
 test_ma_pred = ma_forecast[:len(test_data)]
@@ -159,6 +299,99 @@ for _, row in future_ma.head(7).iterrows():
     print(f"  {row['date'].strftime('%Y-%m-%d')}: {row['forecast']:,.0f} ops (95% CI: [{row['lower_95']:,.0f}, {row['upper_95']:,.0f}])")
 print(f"  ... (showing first 7 days)")
 
+# Rolling-origin backtest: every day from backtest_min_train onward is a forecast origin
+print(f"\n" + "=" * 90)
+print("ROLLING-ORIGIN BACKTEST")
+print("=" * 90)
+
+def rolling_origin_backtest(series, origins, horizon, grid, tuning_days=validation_days, n_workers=4):
+    """Actuals, forecasts (n_origins × horizon) and chosen grid row from every origin, re-tuning only on data up to each origin"""
+    series = np.asarray(series, dtype=float)
+    n_days = len(series)
+    origins = np.asarray(origins)
+    tuning_cutoffs = origins - tuning_days
+    n_settings = len(grid)
+    
+    # Target day for each (origin, horizon step) and its observed value
+    target_day = origins[:, None] + np.arange(1, horizon + 1)[None, :]
+    observed = target_day < n_days
+    actual = np.where(observed, series[np.minimum(target_day, n_days - 1)], np.nan)
+    
+    # Snapshots are flattened in (day, setting) order over the sorted snapshot days
+    snapshot_days = np.union1d(origins, tuning_cutoffs)
+    state, _, _ = exponential_smoothing_filter(
+        np.broadcast_to(series, (n_settings, n_days)), grid['alpha'], grid['beta'], grid['phi'],
+        grid['gamma'], grid['period'], snapshot_days=snapshot_days)
+    snapshots = state['snapshots']
+    
+    es_forecast = np.empty((len(origins), horizon))
+    chosen_setting = np.empty(len(origins), dtype=int)
+    
+    origins_per_worker = -(-len(origins) // max(1, n_workers))
+    
+    def _backtest_origins(start):
+        origin_idx = np.arange(start, min(start + origins_per_worker, len(origins)))
+        cutoffs = tuning_cutoffs[origin_idx]
+        tuning_rows = (np.searchsorted(snapshot_days, cutoffs)[:, None] * n_settings + np.arange(n_settings)).ravel()
+        validation_forecast = np.maximum(0, exponential_smoothing_forecast(
+            {key: value[tuning_rows] for key, value in snapshots.items()}, tuning_days))
+        validation_actual = series[cutoffs[:, None] + np.arange(1, tuning_days + 1)[None, :]]
+        validation_mae = np.abs(validation_forecast.reshape(len(origin_idx), n_settings, tuning_days)
+                                - validation_actual[:, None, :]).mean(axis=2)
+        chosen = validation_mae.argmin(axis=1)
+        origin_rows = np.searchsorted(snapshot_days, origins[origin_idx]) * n_settings + chosen
+        es_forecast[origin_idx] = np.maximum(0, exponential_smoothing_forecast(
+            {key: value[origin_rows] for key, value in snapshots.items()}, horizon))
+        chosen_setting[origin_idx] = chosen
+    
+    run_in_chunks(_backtest_origins, len(origins), origins_per_worker, n_workers)
+    
+    # Weighted moving average at every origin from trailing sums
+    prefix = np.concatenate([[0.0], np.cumsum(series)])
+    wma_level = np.zeros(len(origins))
+    for window, weight in zip(wma_windows, wma_weights):
+        span = np.minimum(window, origins + 1)
+        wma_level += weight * (prefix[origins + 1] - prefix[origins + 1 - span]) / span
+    wma_forecast = np.repeat(wma_level[:, None], horizon, axis=1)
+    
+    return actual, {'Exponential Smoothing': es_forecast, 'Moving Average': wma_forecast}, chosen_setting
+
+def backtest_metrics_by_horizon(actual, model_forecasts):
+    """MAE, RMSE and MAPE per model and horizon step over all observed (series, origin) folds"""
+    rows = []
+    for model_name, model_forecast in model_forecasts.items():
+        errors = actual - model_forecast
+        for step in range(actual.shape[-1]):
+            step_errors = errors[..., step]
+            rows.append({
+                'model': model_name,
+                'horizon': step + 1,
+                'mae': np.nanmean(np.abs(step_errors)),
+                'rmse': np.sqrt(np.nanmean(step_errors ** 2)),
+                'mape': np.nanmean(np.abs(step_errors / (actual[..., step] + 1))) * 100,
+                'n_forecasts': int(np.sum(~np.isnan(step_errors)))
+            })
+    return pd.DataFrame(rows)
+
+backtest_horizon = 14
+backtest_min_train = 14
+backtest_origins = np.arange(max(backtest_min_train, validation_days + 1) - 1, len(forecast_data) - 1)
+backtest_actual, backtest_forecasts, backtest_chosen_setting = rolling_origin_backtest(
+    forecast_data['total_operations'].values, backtest_origins, backtest_horizon, smoothing_grid)
+backtest_metrics = backtest_metrics_by_horizon(backtest_actual, backtest_forecasts)
+
+print(f"\n📊 WALK-FORWARD ERRORS ({len(backtest_origins)} origins, horizons 1-{backtest_horizon} days):")
+print(f"  Smoothing re-tuned at every origin on data up to that origin "
+      f"({len(np.unique(backtest_chosen_setting))} distinct settings chosen)")
+print(f"\n  {'Model':<24} {'Horizon':>8} {'MAE':>14} {'RMSE':>14} {'MAPE':>10} {'Folds':>7}")
+for _, row in backtest_metrics[backtest_metrics['horizon'].isin([1, 3, 7, 14])].iterrows():
+    print(f"  {row['model']:<24} {row['horizon']:>8} {row['mae']:>14,.0f} {row['rmse']:>14,.0f} {row['mape']:>9.2f}% {row['n_forecasts']:>7}")
+
+backtest_model_mape = backtest_metrics.groupby('model')['mape'].mean()
+print(f"\n  Mean MAPE across horizons:")
+for model_name, model_mape in backtest_model_mape.items():
+    print(f"    {model_name}: {model_mape:.2f}%")
+
 # Model Comparison
 print(f"\n" + "=" * 90)
 print("MODEL COMPARISON & RECOMMENDATIONS")
@@ -171,9 +404,9 @@ print(f"  {'MAE (operations)':<30} {mae_exp:>15,.0f}    {mae_ma:>15,.0f}")
 print(f"  {'RMSE (operations)':<30} {rmse_exp:>15,.0f}    {rmse_ma:>15,.0f}")
 print(f"  {'MAPE (%)':<30} {mape_exp:>15.2f}%   {mape_ma:>15.2f}%")
 
-best_model = "Exponential Smoothing" if mape_exp < mape_ma else "Moving Average"
+best_model = backtest_model_mape.idxmin()
 print(f"\n✅ RECOMMENDED MODEL: {best_model}")
-print(f"   Lower MAPE indicates better percentage accuracy on test set")
+print(f"   Lowest mean MAPE across {len(backtest_origins)} rolling forecast origins")
 
 # Ensemble Forecast (average of both models)
 ensemble_forecast = (exp_forecast_df.set_index('date')['forecast'] + ma_forecast_df.set_index('date')['forecast']) / 2
@@ -203,8 +436,498 @@ print(f"  Forecast range: {forecast_range:,.0f} operations")
 print(f"  Average 95% CI width: {avg_ci_width:,.0f} operations")
 print(f"  Forecast stability: {'High' if forecast_range < avg_forecast * 0.1 else 'Moderate' if forecast_range < avg_forecast * 0.3 else 'Variable'}")
 
+# District × operation-type batch forecasts
+print(f"\n" + "=" * 90)
+print("DISTRICT BATCH FORECASTS")
+print("=" * 90)
+
+# Compact per-series grid drawn from the national search space
+batch_smoothing_grid = smoothing_grid[
+    smoothing_grid['alpha'].isin([0.1, 0.3, 0.5, 0.7]) & smoothing_grid['beta'].isin([0.01, 0.1]) &
+    smoothing_grid['phi'].isin([0.9, 1.0]) & smoothing_grid['gamma'].isin([0.0, 0.1])
+].reset_index(drop=True)
+
+def batch_forecast(series_matrix, horizon, grid, validation_days=7, chunk_size=512, n_workers=4):
+    """Validation-tuned exponential smoothing and moving-average forecasts (n_series × horizon) plus the chosen grid row per series"""
+    series_matrix = np.asarray(series_matrix, dtype=float)
+    n_series = series_matrix.shape[0]
+    n_settings = len(grid)
+    es_forecast = np.zeros((n_series, horizon))
+    chosen_setting = np.zeros(n_series, dtype=int)
+    grid_params = {col: grid[col].to_numpy() for col in ['alpha', 'beta', 'phi', 'gamma', 'period']}
+    
+    def _forecast_chunk(start):
+        chunk = series_matrix[start:start + chunk_size]
+        n_chunk = len(chunk)
+        # Every (series, setting) pair is one filter run
+        tuning_state, _, _ = exponential_smoothing_filter(
+            np.repeat(chunk[:, :-validation_days], n_settings, axis=0),
+            *(np.tile(grid_params[col], n_chunk) for col in ['alpha', 'beta', 'phi', 'gamma', 'period']))
+        validation = np.maximum(0, exponential_smoothing_forecast(tuning_state, validation_days))
+        validation_mae = np.abs(validation.reshape(n_chunk, n_settings, validation_days) -
+                                chunk[:, None, -validation_days:]).mean(axis=2)
+        best = validation_mae.argmin(axis=1)
+        fitted_state, _, _ = exponential_smoothing_filter(
+            chunk, *(grid_params[col][best] for col in ['alpha', 'beta', 'phi', 'gamma', 'period']))
+        es_forecast[start:start + n_chunk] = np.maximum(0, exponential_smoothing_forecast(fitted_state, horizon))
+        chosen_setting[start:start + n_chunk] = best
+    
+    run_in_chunks(_forecast_chunk, n_series, chunk_size, n_workers)
+    
+    wma_forecast = np.repeat(weighted_moving_average_level(series_matrix)[:, None], horizon, axis=1)
+    return es_forecast, wma_forecast, chosen_setting
+
+batch_horizon = 14
+batch_operation_types = ['enrolment', 'demographic_update', 'biometric_update']
+# Rows are district-major: (district 0, enrolment), (district 0, demographic), ...
+district_series = np.stack([district_daily_enrolments, district_daily_demo_updates, district_daily_bio_updates],
+                           axis=1).reshape(-1, len(panel_dates))
+district_es_forecast, district_wma_forecast, district_chosen_setting = batch_forecast(
+    district_series, batch_horizon, batch_smoothing_grid)
+
+# One array-backed table: district × operation type × horizon day
+batch_forecast_dates = pd.date_range(start=panel_dates[-1] + pd.Timedelta(days=1), periods=batch_horizon, freq='D')
+_batch_rows = np.repeat(np.arange(len(district_series)), batch_horizon)
+district_forecast_table = pd.DataFrame({
+    'state': pd.Categorical(panel_districts['state'].to_numpy()[_batch_rows // len(batch_operation_types)]),
+    'district': pd.Categorical(panel_districts['district'].to_numpy()[_batch_rows // len(batch_operation_types)]),
+    'operation_type': pd.Categorical(np.array(batch_operation_types)[_batch_rows % len(batch_operation_types)]),
+    'date': np.tile(batch_forecast_dates, len(district_series)),
+    'es_forecast': district_es_forecast.ravel(),
+    'wma_forecast': district_wma_forecast.ravel(),
+    'ensemble_forecast': ((district_es_forecast + district_wma_forecast) / 2).ravel()
+})
+
+district_forecast_load = (district_forecast_table.groupby(['state', 'district'], observed=True)['ensemble_forecast']
+                          .sum().sort_values(ascending=False))
+print(f"\n📊 BATCH SUMMARY:")
+print(f"  Series forecast: {len(district_series):,} ({len(panel_districts):,} districts × {len(batch_operation_types)} operation types)")
+print(f"  Settings evaluated per series: {len(batch_smoothing_grid)}")
+print(f"  Forecast table rows: {len(district_forecast_table):,}")
+print(f"\n  Top 10 districts by forecast {batch_horizon}-day load (ensemble):")
+for (_fc_state, _fc_district), _fc_load in district_forecast_load.head(10).items():
+    print(f"    {_fc_district}, {_fc_state}: {_fc_load:,.0f} operations")
+
+# Persisted per-series forecast state: a new day is absorbed in O(1) per series
+print(f"\n" + "=" * 90)
+print("PERSISTED FORECAST STATE & INCREMENTAL REFRESH")
+print("=" * 90)
+
+forecast_ring_size = 56  # Trailing days of values and one-step errors the state keeps for bootstrap bands
+forecast_state_paths = {'national': 'national_forecast_state.npz', 'district': 'district_forecast_state.npz',
+                        'aggregate': 'aggregate_forecast_state.npz'}
+forecast_state_fields = {'level', 'trend', 'season', 'alpha', 'beta', 'phi', 'gamma', 'period', 'n_days',
+                         'resid_count', 'resid_mean', 'resid_m2', 'recent', 'recent_errors', 'window_sums'}
+
+def init_forecast_state(series_matrix, alpha, beta, phi=1.0, gamma=0.0, period=0):
+    """Fit every series once, keeping smoothing state, residual moments, recent-day rings and moving-average sums for refreshes"""
+    series_matrix = np.atleast_2d(np.asarray(series_matrix, dtype=float))
+    n_series, n_days = series_matrix.shape
+    state, level_path, one_step = exponential_smoothing_filter(series_matrix, alpha, beta, phi, gamma, period)
+    state['n_days'] = np.full(n_series, n_days)
+    residuals = series_matrix - level_path
+    state['resid_count'] = np.full(n_series, float(n_days))
+    state['resid_mean'] = residuals.mean(axis=1)
+    state['resid_m2'] = ((residuals - state['resid_mean'][:, None]) ** 2).sum(axis=1)
+    # Day t sits in ring slot t % forecast_ring_size; day 0 has no one-step error
+    ring_days = np.arange(max(0, n_days - forecast_ring_size), n_days)
+    state['recent'] = np.zeros((n_series, forecast_ring_size))
+    state['recent'][:, ring_days % forecast_ring_size] = series_matrix[:, ring_days]
+    state['recent_errors'] = np.zeros((n_series, forecast_ring_size))
+    state['recent_errors'][:, ring_days % forecast_ring_size] = np.where(ring_days > 0, (series_matrix - one_step)[:, ring_days], 0.0)
+    state['window_sums'] = np.stack([series_matrix[:, -window:].sum(axis=1) for window in wma_windows], axis=1)
+    return state
+
+def update_forecast_state(state, new_values):
+    """Absorb one new day per series in place without touching earlier history"""
+    new_values = np.asarray(new_values, dtype=float)
+    day = state['n_days'].copy()
+    one_step = exponential_smoothing_step(state, new_values)
+    
+    delta = new_values - state['level'] - state['resid_mean']
+    state['resid_count'] = state['resid_count'] + 1
+    state['resid_mean'] = state['resid_mean'] + delta / state['resid_count']
+    state['resid_m2'] = state['resid_m2'] + delta * (new_values - state['level'] - state['resid_mean'])
+    
+    # Values leaving each trailing window are still in the ring buffer
+    rows = np.arange(len(new_values))
+    ring_size = state['recent'].shape[1]
+    for _win_idx, window in enumerate(wma_windows):
+        leaving = np.where(day >= window, state['recent'][rows, (day - window) % ring_size], 0.0)
+        state['window_sums'][:, _win_idx] += new_values - leaving
+    state['recent'][rows, day % ring_size] = new_values
+    state['recent_errors'][rows, day % ring_size] = new_values - one_step
+    return state
+
+def ring_history(state, key, n_values):
+    """Last n_values entries of a ring buffer in chronological order (n_series × n_values)"""
+    days = state['n_days'][:, None] - n_values + np.arange(n_values)[None, :]
+    return np.take_along_axis(state[key], days % state[key].shape[1], axis=1)
+
+def emit_forecast(state, horizon, n_paths=bootstrap_paths, confidence=0.95, seed=42, chunk_size=64, n_workers=4):
+    """Exponential-smoothing and moving-average forecasts with bootstrap 95% bands (each n_series × horizon) from the state's rings"""
+    n_days = state['n_days']
+    es = np.maximum(0, exponential_smoothing_forecast(state, horizon))
+    wma_level = np.zeros(len(n_days))
+    for _win_idx, (window, weight) in enumerate(zip(wma_windows, wma_weights)):
+        wma_level += weight * state['window_sums'][:, _win_idx] / np.minimum(window, n_days)
+    wma = np.repeat(wma_level[:, None], horizon, axis=1)
+    
+    n_recent = min(state['recent'].shape[1], int(n_days.min()))
+    recent_values = ring_history(state, 'recent', n_recent)
+    recent_errors = ring_history(state, 'recent_errors', n_recent - 1)
+    bands = {key: np.zeros((len(n_days), horizon)) for key in ['es_lower_95', 'es_upper_95', 'wma_lower_95', 'wma_upper_95']}
+    
+    def _band_chunk(start):
+        rows = slice(start, start + chunk_size)
+        es_paths = simulate_smoothing_paths({key: value[rows] for key, value in state.items()}, recent_errors[rows],
+                                            horizon=horizon, n_paths=n_paths, seed=seed + start)
+        bands['es_lower_95'][rows], bands['es_upper_95'][rows] = bootstrap_intervals(es_paths, confidence)
+        wma_paths = bootstrap_moving_average_paths(recent_values[rows], horizon=horizon, n_paths=n_paths, seed=seed + start)
+        bands['wma_lower_95'][rows], bands['wma_upper_95'][rows] = bootstrap_intervals(wma_paths, confidence)
+    
+    run_in_chunks(_band_chunk, len(n_days), chunk_size, n_workers)
+    return {'es_forecast': es, 'wma_forecast': wma, **bands}
+
+def save_forecast_state(state, path, last_date, series_keys):
+    """Write a forecast state, its last absorbed date and its series row keys to a compressed .npz archive"""
+    np.savez_compressed(path, last_date=np.datetime64(last_date, 'D'), series_keys=np.asarray(series_keys, dtype=str), **state)
+
+def load_forecast_state(path, series_keys, dates):
+    """Saved state and its last date, or None if missing, for other series or inconsistent with the dates axis"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path) as archive:
+            state = {key: archive[key] for key in archive.files if key not in ('last_date', 'series_keys')}
+            last_date = pd.Timestamp(archive['last_date'].item())
+            saved_keys = archive['series_keys']
+    except (OSError, KeyError, ValueError):
+        return None
+    if set(state) != forecast_state_fields or state['recent'].shape[1] != forecast_ring_size:
+        return None
+    # The state must cover exactly the dates up to its last date, for the same series in the same order
+    if (not np.array_equal(saved_keys, np.asarray(series_keys, dtype=str)) or last_date > dates[-1]
+            or np.any(state['n_days'] != dates.searchsorted(last_date, side='right'))):
+        return None
+    return state, last_date
+
+def refresh_forecast_state(path, series_matrix, dates, series_keys, smoothing_params, fit_days=None):
+    """(state, days folded in, resumed) for the persisted state advanced to the last date; refit only when it is unusable"""
+    series_matrix = np.atleast_2d(np.asarray(series_matrix, dtype=float))
+    saved = load_forecast_state(path, series_keys, dates)
+    if saved is not None:
+        state, _ = saved
+        first_new_day = int(state['n_days'][0])
+    else:
+        first_new_day = len(dates) if fit_days is None else fit_days
+        state = init_forecast_state(series_matrix[:, :first_new_day], *smoothing_params)
+    for day in range(first_new_day, len(dates)):
+        update_forecast_state(state, series_matrix[:, day])
+    save_forecast_state(state, path, dates[-1], series_keys)
+    return state, len(dates) - first_new_day, saved is not None
+
+def forecast_series_keys(region_labels, operation_types):
+    """Row keys of a region-major (region, operation type) series matrix"""
+    return np.char.add(np.char.add(np.repeat(np.asarray(region_labels, dtype=str), len(operation_types)), '/'),
+                       np.tile(np.asarray(operation_types, dtype=str), len(region_labels)))
+
+# National model: resume the saved state, or fit on the training window and absorb the held-out days without refitting
+national_forecast_state, national_new_days, national_resumed = refresh_forecast_state(
+    forecast_state_paths['national'], forecast_data['total_operations'].values, pd.DatetimeIndex(forecast_data['Date']),
+    ['national/total_operations'], (alpha, beta, phi, gamma, seasonal_period), fit_days=train_size)
+national_refresh = emit_forecast(national_forecast_state, 14)
+print(f"\n📅 NATIONAL FORECAST AFTER ABSORBING {national_new_days} NEW DAYS (no refit; "
+      f"{'resumed from ' + forecast_state_paths['national'] if national_resumed else f'fitted on the first {train_size} days'}):")
+for _day_idx in range(7):
+    print(f"  {future_dates[_day_idx].strftime('%Y-%m-%d')}: {national_refresh['es_forecast'][0, _day_idx]:>12,.0f} "
+          f"(95% CI: {national_refresh['es_lower_95'][0, _day_idx]:>12,.0f} - {national_refresh['es_upper_95'][0, _day_idx]:>12,.0f})")
+print(f"  ... (showing first 7 days)")
+
+# District batch: one state per series, fitted at its chosen setting only when no usable saved state exists
+district_series_keys = forecast_series_keys(
+    (panel_districts['state'].astype(str) + '/' + panel_districts['district'].astype(str)).to_numpy(), batch_operation_types)
+district_forecast_state, district_new_days, district_resumed = refresh_forecast_state(
+    forecast_state_paths['district'], district_series, panel_dates, district_series_keys,
+    [batch_smoothing_grid[col].to_numpy()[district_chosen_setting] for col in ['alpha', 'beta', 'phi', 'gamma', 'period']])
+district_bands = emit_forecast(district_forecast_state, batch_horizon)
+
+print(f"\n📊 PERSISTED STATE:")
+print(f"  Series: {len(district_series):,} district + {len(batch_operation_types) * (1 + len(panel_states)):,} "
+      f"national/state + 1 national total, saved to {', '.join(forecast_state_paths.values())}")
+print(f"  Per-series state: level, trend, seasonal indices, residual moments, last "
+      f"{district_forecast_state['recent'].shape[1]} days and one-step errors, trailing window sums")
+print(f"  District state: {'resumed, ' + str(district_new_days) + ' new day(s) folded in' if district_resumed else 'fitted from full history (no usable saved state)'}")
+
+# Hierarchical reconciliation: district forecasts must add up to state and national forecasts
+print(f"\n" + "=" * 90)
+print("HIERARCHICAL FORECAST RECONCILIATION (DISTRICT → STATE → NATIONAL)")
+print("=" * 90)
+
+from scipy import sparse
+from scipy.sparse.linalg import spsolve
+
+def hierarchy_summing_matrix(bottom_parent_codes, n_parents, n_operation_types):
+    """Sparse summing matrix from child-major (child, operation type) series to national, parent and bottom rows, in that order"""
+    n_children = len(bottom_parent_codes)
+    n_bottom = n_children * n_operation_types
+    bottom = np.arange(n_bottom)
+    op_codes = bottom % n_operation_types
+    parent_rows = n_operation_types + np.repeat(bottom_parent_codes, n_operation_types) * n_operation_types + op_codes
+    bottom_rows = n_operation_types * (1 + n_parents) + bottom
+    rows = np.concatenate([op_codes, parent_rows, bottom_rows])
+    return sparse.csr_matrix((np.ones(3 * n_bottom), (rows, np.tile(bottom, 3))),
+                             shape=(n_operation_types * (1 + n_parents) + n_bottom, n_bottom))
+
+def reconcile_forecasts(base_forecasts, summing, method, residual_var=None, bottom_history=None):
+    """Coherent forecasts for every hierarchy node by bottom_up, top_down (historical shares) or diagonal mint"""
+    summing = sparse.csr_matrix(summing)
+    n_all, n_bottom = summing.shape
+    n_aggregate = n_all - n_bottom
+    base_forecasts = np.asarray(base_forecasts, dtype=float)
+    if method == 'bottom_up':
+        return summing @ base_forecasts[n_aggregate:]
+    if method == 'top_down':
+        # Top node of each bottom series is its first (lowest) row in the summing matrix
+        summing_csc = summing.tocsc()
+        summing_csc.sort_indices()
+        top_rows = summing_csc.indices[summing_csc.indptr[:-1]]
+        history_mean = np.asarray(bottom_history, dtype=float).mean(axis=1)
+        node_mean = summing @ history_mean
+        shares = np.divide(history_mean, node_mean[top_rows], out=np.zeros(n_bottom), where=node_mean[top_rows] > 0)
+        return summing @ (shares[:, None] * base_forecasts[top_rows])
+    if method == 'mint':
+        weights = np.maximum(np.asarray(residual_var, dtype=float), 1e-9)
+        aggregate_summing = summing[:n_aggregate]
+        # Coherence constraints: constraint @ y = 0 with constraint = [I, -S_aggregate]
+        constraint = sparse.hstack([sparse.identity(n_aggregate), -aggregate_summing]).tocsr()
+        constraint_cov = (sparse.diags(weights[:n_aggregate]) +
+                          aggregate_summing @ sparse.diags(weights[n_aggregate:]) @ aggregate_summing.T).tocsc()
+        correction = spsolve(constraint_cov, constraint @ base_forecasts)
+        correction = correction.reshape(n_aggregate, -1)
+        return base_forecasts - (sparse.diags(weights) @ constraint.T @ correction).reshape(base_forecasts.shape)
+    raise ValueError(f"Unknown reconciliation method: {method}")
+
+# Base forecasts for the aggregate levels come from the same tuned batch models
+state_series = np.stack([state_daily_enrolments, state_daily_demo_updates, state_daily_bio_updates],
+                        axis=1).reshape(-1, len(panel_dates))
+national_series = state_series.reshape(len(panel_states), len(batch_operation_types), -1).sum(axis=0)
+aggregate_series = np.vstack([national_series, state_series])
+_, _, aggregate_chosen_setting = batch_forecast(aggregate_series, batch_horizon, batch_smoothing_grid)
+aggregate_forecast_state, _, _ = refresh_forecast_state(
+    forecast_state_paths['aggregate'], aggregate_series, panel_dates,
+    forecast_series_keys(np.concatenate([['national'], panel_states.astype(str)]), batch_operation_types),
+    [batch_smoothing_grid[col].to_numpy()[aggregate_chosen_setting] for col in ['alpha', 'beta', 'phi', 'gamma', 'period']])
+aggregate_bands = emit_forecast(aggregate_forecast_state, batch_horizon)
+
+hierarchy_summing = hierarchy_summing_matrix(panel_state_codes, len(panel_states), len(batch_operation_types))
+hierarchy_base_forecast = np.vstack([
+    (aggregate_bands['es_forecast'] + aggregate_bands['wma_forecast']) / 2,
+    (district_bands['es_forecast'] + district_bands['wma_forecast']) / 2
+])
+hierarchy_residual_var = np.concatenate([
+    aggregate_forecast_state['resid_m2'] / aggregate_forecast_state['resid_count'],
+    district_forecast_state['resid_m2'] / district_forecast_state['resid_count']
+])
+reconciled_forecasts = {
+    'bottom_up': reconcile_forecasts(hierarchy_base_forecast, hierarchy_summing, 'bottom_up'),
+    'top_down': reconcile_forecasts(hierarchy_base_forecast, hierarchy_summing, 'top_down',
+                                    bottom_history=district_series),
+    'mint': reconcile_forecasts(hierarchy_base_forecast, hierarchy_summing, 'mint',
+                                residual_var=hierarchy_residual_var)
+}
+
+_n_aggregate = len(aggregate_series)
+base_incoherence = np.abs(hierarchy_base_forecast[:_n_aggregate] -
+                          hierarchy_summing[:_n_aggregate] @ hierarchy_base_forecast[_n_aggregate:]).max()
+print(f"\n📊 HIERARCHY:")
+print(f"  Nodes: {hierarchy_summing.shape[0]:,} ({len(batch_operation_types)} national, {len(state_series):,} state, "
+      f"{len(district_series):,} district series)")
+print(f"  Largest base-forecast gap between an aggregate and the sum of its districts: {base_incoherence:,.0f} operations/day")
+print(f"\n  {'Method':<12} " + " ".join(f"{op_type:>20}" for op_type in batch_operation_types) + f" {'Max gap':>10}")
+print(f"  {'base':<12} " + " ".join(f"{total:>20,.0f}" for total in hierarchy_base_forecast[:len(batch_operation_types)].sum(axis=1)))
+for method_name, method_forecast in reconciled_forecasts.items():
+    _gap = np.abs(method_forecast[:_n_aggregate] - hierarchy_summing[:_n_aggregate] @ method_forecast[_n_aggregate:]).max()
+    print(f"  {method_name:<12} " + " ".join(f"{total:>20,.0f}" for total in method_forecast[:len(batch_operation_types)].sum(axis=1))
+          + f" {_gap:>10.2g}")
+print(f"  (national {batch_horizon}-day totals by operation type)")
+
+# Bootstrap prediction intervals for every district series in one batched call
+print(f"\n" + "=" * 90)
+print("DISTRICT BOOTSTRAP PREDICTION INTERVALS")
+print("=" * 90)
+
+def batch_bootstrap_intervals(series_matrix, smoothing_params, horizon, n_paths=1000, confidence=0.95,
+                              chunk_size=64, n_workers=4):
+    """Bootstrap 95% intervals for the smoothing and moving-average forecasts of every series, simulated in chunks"""
+    series_matrix = np.asarray(series_matrix, dtype=float)
+    n_series = series_matrix.shape[0]
+    bands = {key: np.zeros((n_series, horizon)) for key in ['es_lower_95', 'es_upper_95', 'wma_lower_95', 'wma_upper_95']}
+    
+    def _bootstrap_chunk(start):
+        chunk = slice(start, start + chunk_size)
+        es_paths = bootstrap_smoothing_paths(
+            series_matrix[chunk], *(smoothing_params[col][chunk] for col in ['alpha', 'beta', 'phi', 'gamma', 'period']),
+            horizon=horizon, n_paths=n_paths, seed=start)
+        bands['es_lower_95'][chunk], bands['es_upper_95'][chunk] = bootstrap_intervals(es_paths, confidence)
+        wma_paths = bootstrap_moving_average_paths(series_matrix[chunk], horizon=horizon, n_paths=n_paths, seed=start)
+        bands['wma_lower_95'][chunk], bands['wma_upper_95'][chunk] = bootstrap_intervals(wma_paths, confidence)
+    
+    run_in_chunks(_bootstrap_chunk, n_series, chunk_size, n_workers)
+    return bands
+
+district_smoothing_params = {col: batch_smoothing_grid[col].to_numpy()[district_chosen_setting]
+                             for col in ['alpha', 'beta', 'phi', 'gamma', 'period']}
+district_bootstrap_bands = batch_bootstrap_intervals(district_series, district_smoothing_params, batch_horizon,
+                                                     n_paths=bootstrap_paths)
+for _band_col, _band_values in district_bootstrap_bands.items():
+    district_forecast_table[_band_col] = _band_values.ravel()
+
+_state_width = (district_bands['es_upper_95'] - district_bands['es_lower_95']).mean()
+_bootstrap_width = (district_bootstrap_bands['es_upper_95'] - district_bootstrap_bands['es_lower_95']).mean()
+_bootstrap_asymmetry = np.median((district_bootstrap_bands['es_upper_95'] - district_bands['es_forecast']) /
+                                 np.maximum(district_bands['es_forecast'] - district_bootstrap_bands['es_lower_95'], 1))
+print(f"\n📊 INTERVALS ({bootstrap_paths:,} residual-bootstrap paths per series):")
+print(f"  Series: {len(district_series):,} × {batch_horizon}-day horizon")
+print(f"  Mean exp smoothing 95% width: full-history bootstrap {_bootstrap_width:,.0f} vs persisted-state bootstrap "
+      f"(last {forecast_ring_size} days) {_state_width:,.0f} operations")
+print(f"  Median upper/lower half-width ratio: {_bootstrap_asymmetry:.2f} (1.00 = symmetric band)")
+
+# Monte Carlo capacity planning: simulate queues and backlogs against the district forecasts
+print(f"\n" + "=" * 90)
+print("DISTRICT CAPACITY SIMULATION (MONTE CARLO BACKLOG)")
+print("=" * 90)
+
+capacity_service_rate = 50  # Operations one centre completes per day
+capacity_target_utilisation = 0.85  # Centres sized so median demand uses 85% of capacity
+capacity_paths = 2000
+capacity_wait_target_days = 1.0  # Queued work should clear within a day at the 95th percentile
+surge_centre_multipliers = np.array([1.0, 1.25, 1.5, 2.0, 3.0, 4.0, 6.0, 8.0])
+
+def simulate_backlog(demand_paths, daily_capacity):
+    """Carry-over backlog (n_districts × n_paths × horizon) when daily_capacity (n_districts,) is served per day"""
+    backlog = np.zeros(demand_paths.shape[:2])
+    backlog_paths = np.empty_like(demand_paths)
+    for day in range(demand_paths.shape[2]):
+        backlog = np.maximum(0, backlog + demand_paths[:, :, day] - daily_capacity[:, None])
+        backlog_paths[:, :, day] = backlog
+    return backlog_paths
+
+def run_capacity_simulation(forecast_demand, demand_ratios, centres, service_rate=capacity_service_rate,
+                            n_paths=capacity_paths, surge_ratio=None, seed=42, chunk_size=64, n_workers=4):
+    """Backlog and waiting-time percentiles per district from demand paths resampled off historical day ratios"""
+    n_districts, horizon = forecast_demand.shape
+    capacity = np.asarray(centres, dtype=float) * service_rate
+    results = {key: np.zeros(n_districts) for key in
+               ['backlog_p50', 'backlog_p95', 'backlog_p99', 'wait_p50_days', 'wait_p95_days', 'wait_p99_days']}
+    
+    def _simulate_chunk(start):
+        rows = np.arange(start, min(start + chunk_size, n_districts))
+        rng = np.random.default_rng(seed + start)
+        draws = rng.integers(0, demand_ratios.shape[1], (len(rows), n_paths, horizon))
+        ratios = demand_ratios[rows[:, None, None], draws]
+        if surge_ratio is not None:
+            ratios[:, :, 0] = surge_ratio[rows, None]
+        demand_paths = forecast_demand[rows, None, :] * ratios
+        peak_backlog = simulate_backlog(demand_paths, capacity[rows]).max(axis=2)
+        peak_wait = peak_backlog / np.maximum(capacity[rows], 1)[:, None]
+        for pct in (50, 95, 99):
+            results[f'backlog_p{pct}'][rows] = np.percentile(peak_backlog, pct, axis=1)
+            results[f'wait_p{pct}_days'][rows] = np.percentile(peak_wait, pct, axis=1)
+    
+    run_in_chunks(_simulate_chunk, n_districts, chunk_size, n_workers)
+    return results
+
+# Daily district demand: ensemble forecast summed over operation types
+district_demand_forecast = ((district_es_forecast + district_wma_forecast) / 2).reshape(
+    len(panel_districts), len(batch_operation_types), batch_horizon).sum(axis=1)
+# Mandatory biometric updates falling due (update dynamics block), spread evenly over each forecast month;
+# days before the first projected month carry none
+_mbu_month_idx = mbu_future_months.get_indexer(batch_forecast_dates.to_period('M'))
+district_mbu_daily = np.where(_mbu_month_idx >= 0,
+                              district_mbu_projection[:, np.maximum(_mbu_month_idx, 0)] / batch_forecast_dates.days_in_month.to_numpy(),
+                              0.0)
+_district_median_ops = np.median(district_daily_operations, axis=1)
+_district_mean_ops = district_daily_operations.mean(axis=1)
+# Day ratios to the mean (not the median) keep E[ratio] = 1, so the mean-level forecast is not inflated
+# before any surge; districts that never reported have no variability to resample and a zero forecast
+capacity_active_districts = _district_mean_ops > 0
+capacity_demand_ratios = np.ones_like(district_daily_operations)
+capacity_demand_ratios[capacity_active_districts] = (district_daily_operations[capacity_active_districts]
+                                                     / _district_mean_ops[capacity_active_districts, None])
+district_centres = np.maximum(1, np.ceil(_district_median_ops / (capacity_service_rate * capacity_target_utilisation)))
+# Spike scenario: each district's median demand ratio on the national spike days flagged by anomaly detection;
+# z_score is absolute, so only days above the mean count as spikes
+_spike_days = np.flatnonzero(((daily_stats['is_spike_zscore'] | daily_stats['is_spike_iqr'])
+                              & (daily_stats['total_operations'] > mean_daily_ops)).to_numpy())
+capacity_spike_scenario = len(_spike_days) > 0
+district_spike_ratio = (np.median(capacity_demand_ratios[:, _spike_days], axis=1) if capacity_spike_scenario
+                        else np.full(len(panel_districts), np.nan))
+
+capacity_baseline = run_capacity_simulation(district_demand_forecast, capacity_demand_ratios, district_centres)
+capacity_mbu = run_capacity_simulation(district_demand_forecast + district_mbu_daily, capacity_demand_ratios, district_centres)
+surge_centres_needed = np.full(len(panel_districts), np.nan)
+if capacity_spike_scenario:
+    capacity_spike = run_capacity_simulation(district_demand_forecast, capacity_demand_ratios, district_centres,
+                                             surge_ratio=district_spike_ratio)
+    # Smallest centre multiple per district that keeps the spike-scenario p95 wait within target
+    for _multiplier in surge_centre_multipliers[::-1]:
+        # Whole centres: the count simulated is the count reported
+        _surge_centres = np.ceil(district_centres * _multiplier)
+        _surge_run = run_capacity_simulation(district_demand_forecast, capacity_demand_ratios, _surge_centres,
+                                             surge_ratio=district_spike_ratio)
+        _meets_target = _surge_run['wait_p95_days'] <= capacity_wait_target_days
+        surge_centres_needed[_meets_target] = _surge_centres[_meets_target]
+else:
+    capacity_spike = {column: np.full(len(panel_districts), np.nan) for column in capacity_baseline}
+
+district_capacity_plan = panel_districts.assign(
+    forecast_daily_demand=district_demand_forecast.mean(axis=1),
+    centres=district_centres,
+    backlog_p95=capacity_baseline['backlog_p95'],
+    wait_p95_days=capacity_baseline['wait_p95_days'],
+    mbu_daily_demand=district_mbu_daily.mean(axis=1),
+    mbu_wait_p95_days=capacity_mbu['wait_p95_days'],
+    spike_ratio=district_spike_ratio,
+    spike_backlog_p95=capacity_spike['backlog_p95'],
+    spike_wait_p95_days=capacity_spike['wait_p95_days'],
+    surge_centres_needed=surge_centres_needed
+).sort_values('spike_wait_p95_days' if capacity_spike_scenario else 'wait_p95_days', ascending=False).reset_index(drop=True)
+
+print(f"\n🔧 SIMULATION SETUP:")
+print(f"  {capacity_paths:,} demand paths × {batch_horizon} days for {len(panel_districts):,} districts")
+print(f"  Service rate: {capacity_service_rate} operations/centre/day; centres sized for {capacity_target_utilisation:.0%} median utilisation")
+print(f"  Demand variability: day ratios to each district's historical mean "
+      f"({(~capacity_active_districts).sum()} districts with no history held at the forecast)")
+print(f"  MBU scenario: forecast plus {district_mbu_daily.sum():,.0f} mandatory biometric updates due over the horizon")
+if capacity_spike_scenario:
+    print(f"  Spike scenario: day 1 at each district's median ratio on {len(_spike_days)} historical spike days")
+else:
+    print(f"  Spike scenario: skipped (no historical day spiked above the mean)")
+print(f"\n📊 NETWORK SUMMARY:")
+print(f"  Centres (baseline): {district_centres.sum():,.0f}")
+print(f"  Districts with p95 wait > {capacity_wait_target_days:.0f} day: baseline {(capacity_baseline['wait_p95_days'] > capacity_wait_target_days).sum()}, "
+      f"MBU {(capacity_mbu['wait_p95_days'] > capacity_wait_target_days).sum()}, "
+      + (f"spike {(capacity_spike['wait_p95_days'] > capacity_wait_target_days).sum()}" if capacity_spike_scenario else "spike n/a"))
+if capacity_spike_scenario:
+    print(f"  Centres needed to absorb a spike within target: {np.nansum(surge_centres_needed):,.0f} "
+          f"({np.isnan(surge_centres_needed).sum()} districts need more than {surge_centre_multipliers[-1]:.0f}×)")
+print(f"\n  Most exposed districts ({'spike' if capacity_spike_scenario else 'baseline'} scenario):")
+print(f"  {'District':<22} {'State':<18} {'Demand/day':>11} {'Centres':>8} {'p95 wait':>9} {'MBU p95':>8}"
+      + (f" {'Spike p95':>10} {'Surge ctrs':>11}" if capacity_spike_scenario else ""))
+for _, _plan in district_capacity_plan.head(10).iterrows():
+    print(f"  {str(_plan['district'])[:22]:<22} {str(_plan['state'])[:18]:<18} {_plan['forecast_daily_demand']:>11,.0f} "
+          f"{_plan['centres']:>8,.0f} {_plan['wait_p95_days']:>8.2f}d {_plan['mbu_wait_p95_days']:>7.2f}d"
+          + (f" {_plan['spike_wait_p95_days']:>9.2f}d {_plan['surge_centres_needed']:>11,.0f}" if capacity_spike_scenario else ""))
+
 print(f"\n✅ Forecasting models developed and validated")
-print(f"   - Exponential smoothing with trend component")
+print(f"   - Exponential smoothing with grid-tuned damped trend"
+      + (" and optional weekly seasonality" if seasonal_calendar_axis else " (no seasonal term on the sparse date axis)"))
 print(f"   - Weighted moving average baseline")
-print(f"   - 95% confidence intervals provided for uncertainty quantification")
+print(f"   - 95% prediction intervals from residual-bootstrap paths")
 print(f"   - Ensemble approach combines model strengths")
+print(f"   - {batch_horizon}-day forecasts for every district and operation type")
+print(f"   - Persisted per-series state refreshed in constant time per new day")
+print(f"   - District, state and national forecasts reconciled to a coherent hierarchy")
+print(f"   - Monte Carlo backlog simulation sizes surge capacity per district")
+print(f"   - Capacity scenario adds the projected mandatory biometric update load")
@@ -27,6 +27,37 @@ daily_trends['total_operations'] = (daily_trends['total_enrolments'] +
                                      daily_trends['total_demo_updates'] + 
                                      daily_trends['total_bio_updates'])
 
+# REGION × DAY PANEL
+# District daily totals as dense arrays on the daily_trends date axis, for batched regional analysis downstream
+panel_dates = pd.DatetimeIndex(daily_trends['Date'])
+district_day = pd.concat([
+    enrolment_temporal.groupby(['state', 'district', 'Date'])['total_enrolments'].sum(),
+    demographic_temporal.groupby(['state', 'district', 'Date'])['total_demo_updates'].sum(),
+    biometric_temporal.groupby(['state', 'district', 'Date'])['total_bio_updates'].sum()
+], axis=1).fillna(0)
+
+_panel_district_codes, _panel_district_index = district_day.index.droplevel('Date').factorize(sort=True)
+_panel_date_codes = panel_dates.get_indexer(district_day.index.get_level_values('Date'))
+panel_districts = _panel_district_index.set_names(['state', 'district']).to_frame(index=False)
+panel_state_codes, panel_states = panel_districts['state'].factorize(sort=True)
+
+district_daily_enrolments = np.zeros((len(panel_districts), len(panel_dates)))
+district_daily_demo_updates = np.zeros((len(panel_districts), len(panel_dates)))
+district_daily_bio_updates = np.zeros((len(panel_districts), len(panel_dates)))
+district_daily_enrolments[_panel_district_codes, _panel_date_codes] = district_day['total_enrolments'].to_numpy()
+district_daily_demo_updates[_panel_district_codes, _panel_date_codes] = district_day['total_demo_updates'].to_numpy()
+district_daily_bio_updates[_panel_district_codes, _panel_date_codes] = district_day['total_bio_updates'].to_numpy()
+district_daily_operations = district_daily_enrolments + district_daily_demo_updates + district_daily_bio_updates
+
+# State panels are row sums of their districts
+state_daily_enrolments = np.zeros((len(panel_states), len(panel_dates)))
+state_daily_demo_updates = np.zeros((len(panel_states), len(panel_dates)))
+state_daily_bio_updates = np.zeros((len(panel_states), len(panel_dates)))
+np.add.at(state_daily_enrolments, panel_state_codes, district_daily_enrolments)
+np.add.at(state_daily_demo_updates, panel_state_codes, district_daily_demo_updates)
+np.add.at(state_daily_bio_updates, panel_state_codes, district_daily_bio_updates)
+state_daily_operations = state_daily_enrolments + state_daily_demo_updates + state_daily_bio_updates
+
 # MONTH-WISE AGGREGATIONS
 monthly_enrolment = enrolment_temporal.groupby('Month_Year')['total_enrolments'].sum().reset_index()
 monthly_demographic = demographic_temporal.groupby('Month_Year')['total_demo_updates'].sum().reset_index()
@@ -89,6 +120,10 @@ print(f"  Avg Daily Biometric Updates: {daily_trends['total_bio_updates'].mean()
 print(f"  Avg Daily Total Operations: {daily_trends['total_operations'].mean():,.0f}")
 print(f"  Peak Daily Operations: {daily_trends['total_operations'].max():,.0f} on {daily_trends.loc[daily_trends['total_operations'].idxmax(), 'Date'].strftime('%Y-%m-%d')}")
 
+print(f"\nREGIONAL DAILY PANEL:")
+print(f"  States × Days: {len(panel_states)} × {len(panel_dates)}")
+print(f"  Districts × Days: {len(panel_districts)} × {len(panel_dates)}")
+
 print(f"\nMONTHLY TRENDS:")
 print(f"  Total Months with Activity: {len(monthly_trends)}")
 print(f"  Avg Monthly Enrolments: {monthly_trends['total_enrolments'].mean():,.0f}")
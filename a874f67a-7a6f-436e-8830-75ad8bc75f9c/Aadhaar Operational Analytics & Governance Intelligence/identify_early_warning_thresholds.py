@@ -1,3 +1,4 @@
+import os
 import pandas as pd
 import numpy as np
 
@@ -19,12 +20,101 @@ print(f"\n" + "=" * 90)
 print("OPERATIONAL LOAD THRESHOLDS")
 print("=" * 90)
 
+# Live thresholds: mergeable log-bucket quantile sketches, one row of bucket counts per region.
+# Sketch counts persist between runs, so each run only ingests new days and never rescans history
+sketch_relative_accuracy = 0.01
+sketch_max_value = 1e10
+
+def create_quantile_sketch(n_regions, relative_accuracy=sketch_relative_accuracy, max_value=sketch_max_value):
+    """Empty mergeable per-region sketch: bucket 0 holds values below 1, bucket i ≥ 1 holds (gamma^(i-2), gamma^(i-1)]"""
+    gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+    n_buckets = int(np.ceil(np.log(max_value) / np.log(gamma))) + 2
+    return {'counts': np.zeros((n_regions, n_buckets), dtype=np.int64), 'gamma': gamma}
+
+def update_quantile_sketch(sketch, values):
+    """Add observations in place: values is (n_regions,) for one new day or (n_regions × n_days) for a backfill"""
+    values = np.asarray(values, dtype=float).reshape(len(sketch['counts']), -1)
+    with np.errstate(divide='ignore'):
+        buckets = np.where(values >= 1, np.ceil(np.log(np.maximum(values, 1)) / np.log(sketch['gamma'])) + 1, 0)
+    buckets = np.clip(buckets, 0, sketch['counts'].shape[1] - 1).astype(int)
+    valid = ~np.isnan(values)
+    rows = np.broadcast_to(np.arange(len(values))[:, None], values.shape)
+    np.add.at(sketch['counts'], (rows[valid], buckets[valid]), 1)
+    return sketch
+
+def sketch_quantiles(sketch, quantiles):
+    """Approximate quantiles (n_regions × n_quantiles) read from bucket counts alone, without any history"""
+    counts = sketch['counts']
+    cumulative = np.cumsum(counts, axis=1)
+    ranks = np.asarray(quantiles, dtype=float)[None, :] * (cumulative[:, -1:] - 1)
+    buckets = np.stack([(cumulative > ranks[:, [q_idx]]).argmax(axis=1) for q_idx in range(ranks.shape[1])], axis=1)
+    gamma = sketch['gamma']
+    # Bucket 1 can only hold exactly 1 (counts below 1 land in bucket 0)
+    values = np.where(buckets > 1, 2 * gamma ** (buckets - 1) / (gamma + 1), buckets.astype(float))
+    return np.where(cumulative[:, -1:] > 0, values, np.nan)
+
+sketch_metrics = {
+    'operations': ('total_operations', district_daily_operations, [0.75, 0.90, 0.95]),
+    'demo_updates': ('total_demo_updates', district_daily_demo_updates, [0.75, 0.90]),
+    'bio_updates': ('total_bio_updates', district_daily_bio_updates, [0.75, 0.90])
+}
+threshold_sketch_path = 'threshold_sketches.npz'
+
+def save_threshold_sketches(path, national_sketches, district_sketches, district_keys, dates):
+    """Write national and district sketch counts with their bucket layout, district row keys and ingested dates"""
+    archive = {'gamma': national_sketches['operations']['gamma'], 'last_date': np.datetime64(dates[-1], 'D'),
+               'n_days': len(dates), 'n_buckets': national_sketches['operations']['counts'].shape[1],
+               'state': district_keys['state'].to_numpy(dtype=str), 'district': district_keys['district'].to_numpy(dtype=str)}
+    for metric in national_sketches:
+        archive[f'national_{metric}'] = national_sketches[metric]['counts']
+        archive[f'district_{metric}'] = district_sketches[metric]['counts']
+    np.savez_compressed(path, **archive)
+
+def load_threshold_sketches(path, district_keys, dates):
+    """Read sketches written by save_threshold_sketches, or None unless bucket layout, districts and dates still match"""
+    expected = create_quantile_sketch(0)
+    with np.load(path) as archive:
+        last_date = pd.Timestamp(archive['last_date'].item())
+        if (not np.isclose(archive['gamma'], expected['gamma']) or int(archive['n_buckets']) != expected['counts'].shape[1]
+                or not np.array_equal(archive['state'], district_keys['state'].to_numpy(dtype=str))
+                or not np.array_equal(archive['district'], district_keys['district'].to_numpy(dtype=str))
+                or last_date > dates[-1] or int(archive['n_days']) != dates.searchsorted(last_date, side='right')):
+            return None
+        national = {metric: {'counts': archive[f'national_{metric}'], 'gamma': expected['gamma']} for metric in sketch_metrics}
+        district = {metric: {'counts': archive[f'district_{metric}'], 'gamma': expected['gamma']} for metric in sketch_metrics}
+        return national, district, last_date
+
+# Resume from the saved sketches and ingest only days after the last saved date; the first run backfills history
+_saved_sketches = (load_threshold_sketches(threshold_sketch_path, panel_districts, panel_dates)
+                   if os.path.exists(threshold_sketch_path) else None)
+if _saved_sketches is None:
+    national_sketches = {metric: create_quantile_sketch(1) for metric in sketch_metrics}
+    district_sketches = {metric: create_quantile_sketch(len(panel_districts)) for metric in sketch_metrics}
+    _new_day_idx = np.arange(len(panel_dates))
+else:
+    national_sketches, district_sketches, _sketch_last_date = _saved_sketches
+    _new_day_idx = np.flatnonzero(panel_dates > _sketch_last_date)
+for metric, (column, panel, _) in sketch_metrics.items():
+    update_quantile_sketch(national_sketches[metric], daily_trends[column].to_numpy()[_new_day_idx])
+    update_quantile_sketch(district_sketches[metric], panel[:, _new_day_idx])
+save_threshold_sketches(threshold_sketch_path, national_sketches, district_sketches, panel_districts, panel_dates)
+
+def live_alert_thresholds(sketches):
+    """Alert-rule thresholds per region from metric sketches, in the order build_alert_rules expects"""
+    ops_p75, ops_p90, ops_p95 = sketch_quantiles(sketches['operations'], [0.75, 0.90, 0.95]).T
+    demo_p75, demo_p90 = sketch_quantiles(sketches['demo_updates'], [0.75, 0.90]).T
+    bio_p75, bio_p90 = sketch_quantiles(sketches['bio_updates'], [0.75, 0.90]).T
+    return (ops_p95, ops_p90, ops_p75), (demo_p90, demo_p75), (bio_p90, bio_p75)
+
+# National thresholds are scalars per rule; district thresholds are (n_districts × 1) columns broadcast over days
+live_national_thresholds = live_alert_thresholds(national_sketches)
+live_district_thresholds = tuple(tuple(values[:, None] for values in tiers)
+                                 for tiers in live_alert_thresholds(district_sketches))
+
 # Baseline metrics from existing analysis
 baseline_daily_ops = daily_trends['total_operations'].median()
 baseline_std = daily_trends['total_operations'].std()
-p75_daily = daily_trends['total_operations'].quantile(0.75)
-p90_daily = daily_trends['total_operations'].quantile(0.90)
-p95_daily = daily_trends['total_operations'].quantile(0.95)
+p95_daily, p90_daily, p75_daily = (float(value[0]) for value in live_national_thresholds[0])
 
 print(f"\n📊 DAILY OPERATIONAL THRESHOLDS:")
 print(f"  Baseline (Median): {baseline_daily_ops:,.0f} operations/day")
@@ -55,11 +145,8 @@ print("=" * 90)
 baseline_demo_updates = daily_trends['total_demo_updates'].median()
 baseline_bio_updates = daily_trends['total_bio_updates'].median()
 
-p75_demo = daily_trends['total_demo_updates'].quantile(0.75)
-p90_demo = daily_trends['total_demo_updates'].quantile(0.90)
-
-p75_bio = daily_trends['total_bio_updates'].quantile(0.75)
-p90_bio = daily_trends['total_bio_updates'].quantile(0.90)
+p90_demo, p75_demo = (float(value[0]) for value in live_national_thresholds[1])
+p90_bio, p75_bio = (float(value[0]) for value in live_national_thresholds[2])
 
 print(f"\n📊 DEMOGRAPHIC UPDATE THRESHOLDS:")
 print(f"  Baseline (Median): {baseline_demo_updates:,.0f} updates/day")
@@ -98,75 +185,126 @@ print(f"   → Top 3 states account for >50% of daily operations")
 print(f"   → Single state exceeds 25% of daily operations")
 print(f"   Interpretation: Geographic concentration creates bottleneck risk")
 
-# Create alert classification function
-def classify_alert_level(operations, demo_updates, bio_updates, growth_rate):
-    """Classify operational status into alert levels"""
-    alert_level = "GREEN"
-    reasons = []
-    
-    # Check operational volume
-    if operations >= p95_daily:
-        alert_level = "RED"
-        reasons.append(f"Operations at {operations:,.0f} (>95th percentile)")
-    elif operations >= p90_daily:
-        if alert_level != "RED":
-            alert_level = "ORANGE"
-        reasons.append(f"Operations at {operations:,.0f} (>90th percentile)")
-    elif operations >= p75_daily:
-        if alert_level not in ["RED", "ORANGE"]:
-            alert_level = "YELLOW"
-        reasons.append(f"Operations at {operations:,.0f} (>75th percentile)")
-    
-    # Check update volumes
-    if demo_updates >= p90_demo:
-        if alert_level not in ["RED"]:
-            alert_level = "ORANGE"
-        reasons.append(f"Demographic updates at {demo_updates:,.0f} (>90th percentile)")
-    elif demo_updates >= p75_demo:
-        if alert_level not in ["RED", "ORANGE"]:
-            alert_level = "YELLOW"
-        reasons.append(f"Demographic updates elevated ({demo_updates:,.0f})")
-    
-    if bio_updates >= p90_bio:
-        if alert_level not in ["RED"]:
-            alert_level = "ORANGE"
-        reasons.append(f"Biometric updates at {bio_updates:,.0f} (>90th percentile)")
-    elif bio_updates >= p75_bio:
-        if alert_level not in ["RED", "ORANGE"]:
-            alert_level = "YELLOW"
-        reasons.append(f"Biometric updates elevated ({bio_updates:,.0f})")
-    
-    # Check growth rate
-    if not np.isnan(growth_rate):
-        if growth_rate > growth_threshold_critical * 1.5:
-            alert_level = "RED"
-            reasons.append(f"Critical growth rate: {growth_rate:.1f}%")
-        elif growth_rate > growth_threshold_critical:
-            if alert_level not in ["RED"]:
-                alert_level = "ORANGE"
-            reasons.append(f"High growth rate: {growth_rate:.1f}%")
-        elif growth_rate > growth_threshold_warning:
-            if alert_level not in ["RED", "ORANGE"]:
-                alert_level = "YELLOW"
-            reasons.append(f"Elevated growth rate: {growth_rate:.1f}%")
-    
-    return alert_level, reasons
+# Vectorised alert engine: each rule is one threshold comparison over whole arrays of region-days
+alert_level_names = np.array(['GREEN', 'YELLOW', 'ORANGE', 'RED'])
+alert_level_codes = {name: code for code, name in enumerate(alert_level_names)}
+
+def build_alert_rules(ops_thresholds, demo_thresholds, bio_thresholds, include_concentration=False):
+    """Alert rules in bit order, tiers of a signal from most to least severe; thresholds broadcast against the signals"""
+    ops_p95, ops_p90, ops_p75 = ops_thresholds
+    demo_p90, demo_p75 = demo_thresholds
+    bio_p90, bio_p75 = bio_thresholds
+    rules = [
+        {'signal': 'operations', 'threshold': ops_p95, 'level': 'RED', 'strict': False,
+         'reason': "Operations at {value:,.0f} (>95th percentile)"},
+        {'signal': 'operations', 'threshold': ops_p90, 'level': 'ORANGE', 'strict': False,
+         'reason': "Operations at {value:,.0f} (>90th percentile)"},
+        {'signal': 'operations', 'threshold': ops_p75, 'level': 'YELLOW', 'strict': False,
+         'reason': "Operations at {value:,.0f} (>75th percentile)"},
+        {'signal': 'demo_updates', 'threshold': demo_p90, 'level': 'ORANGE', 'strict': False,
+         'reason': "Demographic updates at {value:,.0f} (>90th percentile)"},
+        {'signal': 'demo_updates', 'threshold': demo_p75, 'level': 'YELLOW', 'strict': False,
+         'reason': "Demographic updates elevated ({value:,.0f})"},
+        {'signal': 'bio_updates', 'threshold': bio_p90, 'level': 'ORANGE', 'strict': False,
+         'reason': "Biometric updates at {value:,.0f} (>90th percentile)"},
+        {'signal': 'bio_updates', 'threshold': bio_p75, 'level': 'YELLOW', 'strict': False,
+         'reason': "Biometric updates elevated ({value:,.0f})"},
+        {'signal': 'growth_rate', 'threshold': growth_threshold_critical * 1.5, 'level': 'RED', 'strict': True,
+         'reason': "Critical growth rate: {value:.1f}%"},
+        {'signal': 'growth_rate', 'threshold': growth_threshold_critical, 'level': 'ORANGE', 'strict': True,
+         'reason': "High growth rate: {value:.1f}%"},
+        {'signal': 'growth_rate', 'threshold': growth_threshold_warning, 'level': 'YELLOW', 'strict': True,
+         'reason': "Elevated growth rate: {value:.1f}%"}
+    ]
+    if include_concentration:
+        rules += [
+            {'signal': 'top_state_share', 'threshold': concentration_single_state_threshold, 'level': 'ORANGE',
+             'strict': True, 'reason': "Single state at {value:.1f}% of operations"},
+            {'signal': 'top3_state_share', 'threshold': concentration_top3_threshold, 'level': 'YELLOW',
+             'strict': True, 'reason': "Top 3 states at {value:.1f}% of operations"}
+        ]
+    return rules
+
+def evaluate_alerts(signals, rules):
+    """Alert level codes and reason bitmasks (bit i = rule i fired) for every signal element; NaN signals never fire"""
+    shape = np.broadcast_shapes(*(np.shape(values) for values in signals.values()))
+    level_codes = np.zeros(shape, dtype=np.int8)
+    reason_bits = np.zeros(shape, dtype=np.uint32)
+    matched = {}
+    for bit, rule in enumerate(rules):
+        values = signals[rule['signal']]
+        with np.errstate(invalid='ignore'):
+            fired = values > rule['threshold'] if rule['strict'] else values >= rule['threshold']
+        fired = np.broadcast_to(fired, shape) & ~matched.get(rule['signal'], np.zeros(shape, dtype=bool))
+        matched[rule['signal']] = matched.get(rule['signal'], np.zeros(shape, dtype=bool)) | fired
+        reason_bits |= fired.astype(np.uint32) << np.uint32(bit)
+        level_codes = np.maximum(level_codes, np.where(fired, alert_level_codes[rule['level']], 0).astype(np.int8))
+    return level_codes, reason_bits
+
+def render_alert_reasons(reason_bits, signal_values, rules):
+    """Reason text for a single region-day (only called for rows that are displayed)"""
+    reasons = [rule['reason'].format(value=signal_values[rule['signal']])
+               for bit, rule in enumerate(rules) if reason_bits >> bit & 1]
+    return '; '.join(reasons) if reasons else 'Normal operations'
+
+# Regional concentration signal over the state × day operations matrix
+concentration_top_k = 3
+concentration_top3_threshold = 50  # Top 3 states above 50% of daily operations
+concentration_single_state_threshold = 25  # One state above 25% of daily operations
+
+def concentration_measures(region_day_matrix, top_k=concentration_top_k):
+    """Top-1 share, top-k share (%) and HHI (0-10,000) per day of a (n_regions × n_days) matrix or a single day"""
+    matrix = np.asarray(region_day_matrix, dtype=float).reshape(np.shape(region_day_matrix)[0], -1)
+    totals = matrix.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shares = np.where(totals > 0, matrix / totals * 100, np.nan)
+    top_k = min(top_k, len(matrix))
+    top_shares = np.partition(shares, len(matrix) - top_k, axis=0)[len(matrix) - top_k:]
+    return {
+        'top_state_share': top_shares.max(axis=0),
+        'top3_state_share': top_shares.sum(axis=0),
+        'state_hhi': (shares ** 2).sum(axis=0)
+    }
+
+regional_concentration = concentration_measures(state_daily_operations)
+
+# Live thresholds come from the sketches built at the top of the block; check them against exact percentiles
+print(f"\n" + "=" * 90)
+print("STREAMING THRESHOLD SKETCHES")
+print("=" * 90)
+
+print(f"\n📊 NATIONAL THRESHOLDS: SKETCH vs EXACT (±{sketch_relative_accuracy:.0%} relative accuracy):")
+print(f"  {'Threshold':<28} {'Sketch':>14} {'Exact':>14} {'Diff':>8}")
+for metric, (column, _, metric_quantiles) in sketch_metrics.items():
+    _sketch_values = sketch_quantiles(national_sketches[metric], metric_quantiles)[0]
+    for q, _sketch_value in zip(metric_quantiles, _sketch_values):
+        _exact_value = daily_trends[column].quantile(q)
+        print(f"  {metric + f' p{q * 100:.0f}':<28} {_sketch_value:>14,.0f} {_exact_value:>14,.0f} "
+              f"{(_sketch_value / _exact_value - 1) * 100:>7.2f}%")
+
+print(f"\n📦 SKETCH FOOTPRINT:")
+print(f"  Buckets per region per metric: {district_sketches['operations']['counts'].shape[1]:,} (independent of history length)")
+print(f"  Regions: {len(panel_districts):,} districts plus the national total")
+print(f"  Days ingested this run: {len(_new_day_idx)} "
+      f"({'backfill: no saved sketches matching this panel' if _saved_sketches is None else 'resumed from ' + threshold_sketch_path})")
+print(f"  Saved to {threshold_sketch_path}; national and district alert rules read their thresholds from these sketches")
 
 # Apply to historical data
 alert_analysis = daily_trends.copy()
 alert_analysis['growth_rate'] = alert_analysis['total_operations'].pct_change() * 100
-alert_analysis['alert_level'] = None
-alert_analysis['alert_reasons'] = None
-
-for idx, row in alert_analysis.iterrows():
-    level, reasons = classify_alert_level(
-        row['total_operations'],
-        row['total_demo_updates'],
-        row['total_bio_updates'],
-        row['growth_rate']
-    )
-    alert_analysis.at[idx, 'alert_level'] = level
-    alert_analysis.at[idx, 'alert_reasons'] = '; '.join(reasons) if reasons else 'Normal operations'
+for _measure_name, _measure_values in regional_concentration.items():
+    alert_analysis[_measure_name] = _measure_values
+national_alert_rules = build_alert_rules(*live_national_thresholds, include_concentration=True)
+national_alert_signals = {
+    'operations': alert_analysis['total_operations'].to_numpy(dtype=float),
+    'demo_updates': alert_analysis['total_demo_updates'].to_numpy(dtype=float),
+    'bio_updates': alert_analysis['total_bio_updates'].to_numpy(dtype=float),
+    'growth_rate': alert_analysis['growth_rate'].to_numpy(dtype=float),
+    'top_state_share': regional_concentration['top_state_share'],
+    'top3_state_share': regional_concentration['top3_state_share']
+}
+_level_codes, alert_analysis['alert_reason_bits'] = evaluate_alerts(national_alert_signals, national_alert_rules)
+alert_analysis['alert_level'] = pd.Categorical.from_codes(_level_codes, categories=alert_level_names)
 
 # Summarize alert history
 print(f"\n" + "=" * 90)
@@ -181,15 +319,269 @@ for level in ['GREEN', 'YELLOW', 'ORANGE', 'RED']:
     emoji = {'GREEN': '🟢', 'YELLOW': '🟡', 'ORANGE': '🟠', 'RED': '🔴'}.get(level, '')
     print(f"  {emoji} {level}: {count} days ({pct:.1f}%)")
 
+print(f"\n🗺️ REGIONAL CONCENTRATION ({len(panel_states)} states):")
+print(f"  Mean top-{concentration_top_k} share: {np.nanmean(regional_concentration['top3_state_share']):.1f}% "
+      f"(max {np.nanmax(regional_concentration['top3_state_share']):.1f}%)")
+print(f"  Mean largest-state share: {np.nanmean(regional_concentration['top_state_share']):.1f}% "
+      f"(max {np.nanmax(regional_concentration['top_state_share']):.1f}%)")
+print(f"  Mean HHI: {np.nanmean(regional_concentration['state_hhi']):,.0f} "
+      f"(≈ {10000 / np.nanmean(regional_concentration['state_hhi']):.1f} equally sized states)")
+print(f"  Days with top {concentration_top_k} >{concentration_top3_threshold}%: "
+      f"{(regional_concentration['top3_state_share'] > concentration_top3_threshold).sum()}")
+print(f"  Days with one state >{concentration_single_state_threshold}%: "
+      f"{(regional_concentration['top_state_share'] > concentration_single_state_threshold).sum()}")
+
 # Show recent high-alert days
 high_alerts = alert_analysis[alert_analysis['alert_level'].isin(['ORANGE', 'RED'])].copy()
 if len(high_alerts) > 0:
     print(f"\n⚠️ HIGH-ALERT DAYS:")
-    for _, alert in high_alerts.head(10).iterrows():
-        print(f"  {alert['Date'].strftime('%Y-%m-%d')} [{alert['alert_level']}]: {alert['alert_reasons']}")
+    for _alert_pos in np.flatnonzero(alert_analysis['alert_level'].isin(['ORANGE', 'RED']))[:10]:
+        alert = alert_analysis.iloc[_alert_pos]
+        _alert_text = render_alert_reasons(alert['alert_reason_bits'],
+                                           {name: values[_alert_pos] for name, values in national_alert_signals.items()},
+                                           national_alert_rules)
+        print(f"  {alert['Date'].strftime('%Y-%m-%d')} [{alert['alert_level']}]: {_alert_text}")
 else:
     print(f"\n✅ No high-alert days in historical data")
 
+# Exact per-district percentile table (p50-p99), cached and refreshed only for districts with new days;
+# the live alert rules use the sketch thresholds above
+print(f"\n" + "=" * 90)
+print("DISTRICT PERCENTILE THRESHOLDS")
+print("=" * 90)
+
+regional_threshold_percentiles = np.array([50, 75, 90, 95, 99])
+
+def partition_percentiles(region_day_matrix, percentiles=regional_threshold_percentiles):
+    """Linear-interpolated percentiles per row from np.partition on just the order statistics needed"""
+    values = np.asarray(region_day_matrix, dtype=float)
+    positions = np.asarray(percentiles, dtype=float) / 100 * (values.shape[1] - 1)
+    lower, upper = np.floor(positions).astype(int), np.ceil(positions).astype(int)
+    ordered = np.partition(values, np.unique(np.concatenate([lower, upper])), axis=1)
+    return ordered[:, lower] + (positions - lower) * (ordered[:, upper] - ordered[:, lower])
+
+def build_threshold_cache(metric_panels, reported, percentiles=regional_threshold_percentiles):
+    """Per-metric threshold cache over (n_regions × n_days) panels, keeping only each region's reported days"""
+    reported = np.asarray(reported, dtype=bool)
+    # Reported days move to the front of each row in date order; the tail is NaN padding
+    order = np.argsort(~reported, axis=1, kind='stable')
+    n_days = reported.sum(axis=1)
+    padding = np.arange(reported.shape[1]) >= n_days[:, None]
+    cache = {'percentiles': np.asarray(percentiles), 'metrics': {}}
+    for metric, panel in metric_panels.items():
+        values = np.take_along_axis(np.asarray(panel, dtype=float), order, axis=1)
+        values[padding] = np.nan
+        cache['metrics'][metric] = {
+            'values': values,
+            'n_days': n_days.copy(),
+            'thresholds': np.full((len(values), len(percentiles)), np.nan),
+            'stale': n_days > 0
+        }
+    return cache
+
+def record_region_day(cache, metric, day_values, reported):
+    """Append one day for the regions that reported it and invalidate only those regions"""
+    entry = cache['metrics'][metric]
+    regions = np.flatnonzero(np.asarray(reported, dtype=bool))
+    if len(regions) and entry['n_days'][regions].max() >= entry['values'].shape[1]:
+        entry['values'] = np.concatenate([entry['values'], np.full_like(entry['values'], np.nan)], axis=1)
+    entry['values'][regions, entry['n_days'][regions]] = np.asarray(day_values, dtype=float)[regions]
+    entry['n_days'][regions] += 1
+    entry['stale'][regions] = True
+
+def cached_thresholds(cache, metric):
+    """(n_regions × n_percentiles) thresholds, recomputing stale regions grouped by their day count"""
+    entry = cache['metrics'][metric]
+    stale_regions = np.flatnonzero(entry['stale'] & (entry['n_days'] > 0))
+    for day_count in np.unique(entry['n_days'][stale_regions]):
+        rows = stale_regions[entry['n_days'][stale_regions] == day_count]
+        entry['thresholds'][rows] = partition_percentiles(entry['values'][rows, :day_count], cache['percentiles'])
+    entry['stale'][:] = False
+    return entry['thresholds']
+
+# One missing-day rule for backfill and refresh: a district-day with no operations was not reported
+district_threshold_panels = {
+    'operations': district_daily_operations,
+    'demo_updates': district_daily_demo_updates,
+    'bio_updates': district_daily_bio_updates
+}
+district_reported_days = district_daily_operations > 0
+
+# Backfill every day but the newest, then fold the newest day in through the incremental path
+district_threshold_cache = build_threshold_cache({metric: panel[:, :-1] for metric, panel in district_threshold_panels.items()},
+                                                 district_reported_days[:, :-1])
+for _metric in district_threshold_cache['metrics']:
+    cached_thresholds(district_threshold_cache, _metric)
+for _metric, _panel in district_threshold_panels.items():
+    record_region_day(district_threshold_cache, _metric, _panel[:, -1], district_reported_days[:, -1])
+_refreshed_districts = int(district_threshold_cache['metrics']['operations']['stale'].sum())
+
+_district_ops_thresholds = cached_thresholds(district_threshold_cache, 'operations')
+_threshold_rebuild = build_threshold_cache(district_threshold_panels, district_reported_days)
+_refresh_matches_rebuild = all(
+    np.allclose(cached_thresholds(district_threshold_cache, metric), cached_thresholds(_threshold_rebuild, metric), equal_nan=True)
+    for metric in district_threshold_panels
+)
+print(f"\n📊 THRESHOLDS: p{'/p'.join(map(str, regional_threshold_percentiles))} for {len(panel_districts):,} districts × "
+      f"{len(district_threshold_cache['metrics'])} metrics, over each district's reporting days (operations > 0)")
+print(f"  Districts with no reporting days (thresholds NaN): {int((district_threshold_cache['metrics']['operations']['n_days'] == 0).sum()):,}")
+print(f"\n  Busiest districts (operations/day):")
+print(f"  {'District':<24} {'State':<20} " + " ".join(f"{'p' + str(pct):>9}" for pct in regional_threshold_percentiles))
+for _district_idx in np.argsort(-np.nan_to_num(_district_ops_thresholds[:, 0], nan=-np.inf), kind='stable')[:5]:
+    print(f"  {str(panel_districts['district'].iloc[_district_idx])[:24]:<24} {str(panel_districts['state'].iloc[_district_idx])[:20]:<20} "
+          + " ".join(f"{value:>9,.0f}" for value in _district_ops_thresholds[_district_idx]))
+print(f"\n  Refresh for {panel_dates[-1].strftime('%Y-%m-%d')}: {_refreshed_districts:,} reporting districts recomputed, "
+      f"{len(panel_districts) - _refreshed_districts:,} untouched")
+print(f"  Incremental thresholds match a full rebuild: {'✓' if _refresh_matches_rebuild else '✗'}")
+
+# Same engine over the district × day panel, with each district judged against its own history
+print(f"\n" + "=" * 90)
+print("DISTRICT × DAY ALERT ANALYSIS")
+print("=" * 90)
+
+district_alert_signals = {
+    'operations': district_daily_operations,
+    'demo_updates': district_daily_demo_updates,
+    'bio_updates': district_daily_bio_updates
+}
+with np.errstate(divide='ignore', invalid='ignore'):
+    district_alert_signals['growth_rate'] = np.concatenate([
+        np.full((len(panel_districts), 1), np.nan),
+        np.where(district_daily_operations[:, :-1] > 0,
+                 (district_daily_operations[:, 1:] / district_daily_operations[:, :-1] - 1) * 100, np.nan)
+    ], axis=1)
+# Per-district thresholds from the live sketches, as (n_districts × 1) columns broadcast across days
+district_alert_rules = build_alert_rules(*live_district_thresholds)
+district_alert_levels, district_alert_reason_bits = evaluate_alerts(district_alert_signals, district_alert_rules)
+
+print(f"\n📊 ALERT DISTRIBUTION ({district_alert_levels.size:,} district-days):")
+_district_level_counts = np.bincount(district_alert_levels.ravel(), minlength=len(alert_level_names))
+for _level_code, level in enumerate(alert_level_names):
+    emoji = {'GREEN': '🟢', 'YELLOW': '🟡', 'ORANGE': '🟠', 'RED': '🔴'}.get(level, '')
+    print(f"  {emoji} {level}: {_district_level_counts[_level_code]:,} district-days "
+          f"({_district_level_counts[_level_code] / district_alert_levels.size * 100:.1f}%)")
+
+district_red_days = (district_alert_levels == alert_level_codes['RED']).sum(axis=1)
+_latest_day = len(panel_dates) - 1
+print(f"\n⚠️ DISTRICTS WITH MOST RED DAYS (latest-day status):")
+for _district_idx in np.argsort(-district_red_days, kind='stable')[:5]:
+    _latest_text = render_alert_reasons(
+        district_alert_reason_bits[_district_idx, _latest_day],
+        {name: values[_district_idx, _latest_day] for name, values in district_alert_signals.items()},
+        district_alert_rules)
+    print(f"  {panel_districts['district'].iloc[_district_idx]}, {panel_districts['state'].iloc[_district_idx]}: "
+          f"{district_red_days[_district_idx]} RED days; {panel_dates[_latest_day].strftime('%Y-%m-%d')} "
+          f"[{alert_level_names[district_alert_levels[_district_idx, _latest_day]]}]: {_latest_text}")
+
+# Replay history against a grid of rule settings and score them on the detected spike anomalies
+print(f"\n" + "=" * 90)
+print("ALERT RULE BACKTEST & PARAMETER SWEEP")
+print("=" * 90)
+
+from itertools import product
+
+backtest_warmup_days = 28  # Thresholds need this much history before alerts can fire
+backtest_lead_window = 4  # An alert 1-4 days before a spike day counts as a hit; same-day alerts are reported separately
+sweep_percentiles = [0.70, 0.75, 0.80, 0.85, 0.90, 0.925, 0.95, 0.99]
+sweep_growth_thresholds = [25, 50, 75, 100, 125, 150, 200, 300]
+sweep_min_signals = [1, 2]
+
+# Thresholds at day t use only days before t (expanding percentiles)
+def expanding_thresholds(values, percentiles, warmup=backtest_warmup_days):
+    """(n_percentiles × n_days) thresholds from strictly earlier days; NaN during warm-up"""
+    history = pd.Series(values, dtype=float)
+    return np.vstack([history.expanding(min_periods=warmup).quantile(q).shift(1).to_numpy() for q in percentiles])
+
+def backtest_alert_rules(signals, thresholds, settings, event_days, lead_window=backtest_lead_window,
+                         chunk_size=256, n_workers=4):
+    """Hit rate, same-day rate, false-alarm share, lead time and alert load for every rule setting against event_days"""
+    n_days = len(signals['operations'])
+    event_days = np.asarray(event_days)
+    # A hit needs an alert 1..lead_window days before a spike; a spike-day alert only counts as same-day.
+    # Days from which a spike follows within the lead window, or that are spike days themselves
+    near_event = np.zeros(n_days + 1, dtype=int)
+    np.add.at(near_event, np.maximum(event_days - lead_window, 0), 1)
+    np.add.at(near_event, event_days + 1, -1)
+    near_event = np.cumsum(near_event)[:n_days] > 0
+    # Window offsets lead_window..1 before each event (negative days never alert)
+    window_days = event_days[:, None] - np.arange(lead_window, 0, -1)[None, :]
+    results = {key: np.zeros(len(settings))
+               for key in ['hit_rate', 'same_day_rate', 'false_alarm_rate', 'mean_lead_days', 'alert_days']}
+    
+    def _evaluate_chunk(start):
+        chunk = settings.iloc[start:start + chunk_size]
+        with np.errstate(invalid='ignore'):
+            fired = (
+                (signals['operations'][None, :] >= thresholds['operations'][chunk['ops_pct_idx'].to_numpy()]).astype(int) +
+                (signals['demo_updates'][None, :] >= thresholds['demo_updates'][chunk['update_pct_idx'].to_numpy()]) +
+                (signals['bio_updates'][None, :] >= thresholds['bio_updates'][chunk['update_pct_idx'].to_numpy()]) +
+                (signals['growth_rate'][None, :] > chunk['growth_threshold'].to_numpy()[:, None])
+            )
+        alerts = fired >= chunk['min_signals'].to_numpy()[:, None]
+        padded = np.concatenate([np.zeros((len(chunk), 1), dtype=bool), alerts], axis=1)
+        in_window = padded[:, np.maximum(window_days + 1, 0)] & (window_days >= 0)[None]
+        hit = in_window.any(axis=2)
+        n_hits = hit.sum(axis=1)
+        lead_days = np.where(hit, lead_window - in_window.argmax(axis=2), 0).sum(axis=1)
+        n_alerts = alerts.sum(axis=1)
+        rows = slice(start, start + len(chunk))
+        results['hit_rate'][rows] = n_hits / max(len(event_days), 1) * 100
+        results['same_day_rate'][rows] = alerts[:, event_days].sum(axis=1) / max(len(event_days), 1) * 100
+        results['false_alarm_rate'][rows] = np.where(n_alerts > 0, (alerts & ~near_event).sum(axis=1) /
+                                                     np.maximum(n_alerts, 1) * 100, np.nan)
+        results['mean_lead_days'][rows] = np.where(n_hits > 0, lead_days / np.maximum(n_hits, 1), np.nan)
+        results['alert_days'][rows] = n_alerts
+    
+    run_in_chunks(_evaluate_chunk, len(settings), chunk_size, n_workers)
+    return settings.assign(**results)
+
+backtest_signals = {name: national_alert_signals[name] for name in ['operations', 'demo_updates', 'bio_updates', 'growth_rate']}
+backtest_thresholds = {name: expanding_thresholds(backtest_signals[name], sweep_percentiles)
+                       for name in ['operations', 'demo_updates', 'bio_updates']}
+# Spike anomalies after warm-up are the events alerts should anticipate; the z-score flag is two-sided,
+# so only days above the mean count (drops are not spikes)
+_above_mean = (daily_stats['total_operations'] > daily_stats['total_operations'].mean()).to_numpy()
+_is_spike = ((daily_stats['is_spike_zscore'] | daily_stats['is_spike_iqr']).to_numpy()) & _above_mean
+backtest_drop_days = np.flatnonzero(daily_stats['is_spike_zscore'].to_numpy() & ~_above_mean)
+backtest_event_days = np.flatnonzero(_is_spike & (np.arange(len(_is_spike)) >= backtest_warmup_days))
+alert_rule_settings = pd.DataFrame(
+    list(product(range(len(sweep_percentiles)), range(len(sweep_percentiles)), sweep_growth_thresholds, sweep_min_signals)),
+    columns=['ops_pct_idx', 'update_pct_idx', 'growth_threshold', 'min_signals'])
+alert_rule_backtest = backtest_alert_rules(backtest_signals, backtest_thresholds, alert_rule_settings, backtest_event_days)
+alert_rule_backtest['ops_percentile'] = np.array(sweep_percentiles)[alert_rule_backtest['ops_pct_idx']]
+alert_rule_backtest['update_percentile'] = np.array(sweep_percentiles)[alert_rule_backtest['update_pct_idx']]
+_precision = 100 - alert_rule_backtest['false_alarm_rate']
+alert_rule_backtest['f1'] = (2 * _precision * alert_rule_backtest['hit_rate'] /
+                             (_precision + alert_rule_backtest['hit_rate'])).fillna(0)
+
+print(f"\n📊 SWEEP SETUP:")
+print(f"  Settings evaluated: {len(alert_rule_backtest):,} (ops percentile × update percentile × growth threshold × signals required)")
+backtest_scorable_days = max(len(_is_spike) - backtest_warmup_days, 0)
+print(f"  Scorable days: {backtest_scorable_days} of {len(_is_spike)} (after {backtest_warmup_days}-day warm-up)")
+print(f"  Spike anomalies scored: {len(backtest_event_days)} (low-side z-score anomalies excluded: {len(backtest_drop_days)})")
+if np.isin(backtest_drop_days, backtest_event_days).any():
+    print(f"  ⚠️ A drop day is being scored as a spike")
+if len(backtest_event_days) < 5:
+    print(f"  ⚠️ Only {len(backtest_event_days)} scorable spike(s): rankings below rest on very few events")
+print(f"  Hit: alert 1-{backtest_lead_window} days before the spike; same-day: alert on the spike day itself;")
+print(f"  false alarm: alert with no spike on that day or the {backtest_lead_window} days after")
+
+def _print_setting_row(label, row):
+    print(f"  {label:<22} p{row['ops_percentile'] * 100:>4.1f}  p{row['update_percentile'] * 100:>4.1f}  "
+          f">{row['growth_threshold']:>4.0f}%  {row['min_signals']:>3.0f}  {row['hit_rate']:>7.1f}% "
+          f"{row['same_day_rate']:>8.1f}% {row['false_alarm_rate']:>9.1f}% {row['mean_lead_days']:>6.2f}  {row['alert_days']:>6.0f}")
+
+print(f"\n  {'Setting':<22} {'Ops':>6} {'Upd':>6} {'Growth':>6} {'Req':>4} {'Hit':>8} {'Same-day':>9} {'False alm':>10} {'Lead':>6} {'Alerts':>7}")
+for _label, (_ops_q, _upd_q, _growth) in {'Current YELLOW rules': (0.75, 0.75, growth_threshold_warning),
+                                          'Current ORANGE rules': (0.90, 0.90, growth_threshold_critical)}.items():
+    _current = alert_rule_backtest[(alert_rule_backtest['ops_percentile'] == _ops_q) &
+                                   (alert_rule_backtest['update_percentile'] == _upd_q) &
+                                   (alert_rule_backtest['growth_threshold'] == _growth) &
+                                   (alert_rule_backtest['min_signals'] == 1)]
+    _print_setting_row(_label, _current.iloc[0])
+for _rank, (_, _row) in enumerate(alert_rule_backtest.nlargest(5, 'f1').iterrows(), start=1):
+    _print_setting_row(f"Best F1 #{_rank}", _row)
+
 # Recommendations
 print(f"\n" + "=" * 90)
 print("OPERATIONAL RECOMMENDATIONS")
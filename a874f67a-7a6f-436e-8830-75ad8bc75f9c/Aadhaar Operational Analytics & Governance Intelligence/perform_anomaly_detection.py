@@ -1,5 +1,13 @@
 import pandas as pd
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+# Shared with the lead-lag, early-warning and forecasting blocks downstream: numpy kernels release the GIL,
+# so chunks of one array job run on threads without copying their inputs
+def run_in_chunks(func, n_items, chunk_size, n_workers=4):
+    """Call func(start) for every chunk start in range(0, n_items, chunk_size) on a thread pool"""
+    with ThreadPoolExecutor(max_workers=n_workers) as pool:
+        list(pool.map(func, range(0, n_items, max(1, chunk_size))))
 
 # Anomaly detection using statistical methods (IQR and Z-score)
 
@@ -66,6 +74,51 @@ top_daily_peaks = daily_stats.nlargest(5, 'total_operations')[['Date', 'total_op
 # Top 3 monthly peaks
 top_monthly_peaks = monthly_stats.nlargest(3, 'total_operations')[['Month_Year', 'total_operations', 'total_enrolments', 'total_demo_updates', 'total_bio_updates']]
 
+# 5. SPIKE ATTRIBUTION
+# Pre-aggregated region × day × operation-type cubes with day-wise running totals, so any
+# day or month is a difference of two slices rather than a groupby over raw rows
+attribution_operation_types = np.array(['enrolment', 'demographic_update', 'biometric_update'])
+attribution_cubes = {
+    'district': np.stack([district_daily_enrolments, district_daily_demo_updates, district_daily_bio_updates], axis=2),
+    'state': np.stack([state_daily_enrolments, state_daily_demo_updates, state_daily_bio_updates], axis=2)
+}
+attribution_running_totals = {level: np.concatenate([np.zeros((len(cube), 1, cube.shape[2])), np.cumsum(cube, axis=1)], axis=1)
+                              for level, cube in attribution_cubes.items()}
+attribution_baseline_days = 28
+
+def attribute_operations(when, dimension='state', freq='D', within_state=None, baseline_days=attribution_baseline_days):
+    """Contribution of each state, district or operation type to a day's or month's volume, ranked by excess over baseline"""
+    period = pd.Period(when, freq=freq)
+    day_mask = (panel_dates >= period.start_time) & (panel_dates <= period.end_time)
+    if not day_mask.any():
+        raise ValueError(f"No data for {period}")
+    first_day, last_day = np.flatnonzero(day_mask)[[0, -1]]
+    level = 'district' if dimension == 'district' or within_state is not None else 'state'
+    totals = attribution_running_totals[level]
+    period_values = totals[:, last_day + 1] - totals[:, first_day]
+    baseline_start = panel_dates.searchsorted(period.start_time - pd.Timedelta(days=baseline_days))
+    baseline_window = attribution_cubes[level][:, baseline_start:first_day]
+    baseline_values = (np.median(baseline_window, axis=1) if baseline_window.shape[1] else np.zeros_like(period_values)) \
+        * (last_day - first_day + 1)
+    
+    labels = panel_districts if level == 'district' else pd.DataFrame({'state': panel_states})
+    if within_state is not None:
+        rows = np.flatnonzero(panel_districts['state'].to_numpy() == within_state)
+        period_values, baseline_values, labels = period_values[rows], baseline_values[rows], labels.iloc[rows]
+    if dimension == 'operation_type':
+        period_values, baseline_values = period_values.sum(axis=0), baseline_values.sum(axis=0)
+        labels = pd.DataFrame({'operation_type': attribution_operation_types})
+    else:
+        period_values, baseline_values = period_values.sum(axis=1), baseline_values.sum(axis=1)
+    
+    attribution = labels.reset_index(drop=True).assign(operations=period_values, baseline=baseline_values,
+                                                       excess=period_values - baseline_values)
+    total_excess = attribution['excess'].clip(lower=0).sum()
+    attribution['excess_share_pct'] = attribution['excess'].clip(lower=0) / total_excess * 100 if total_excess > 0 else 0.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        attribution['ratio_to_baseline'] = np.where(baseline_values > 0, period_values / baseline_values, np.nan)
+    return attribution.sort_values('excess', ascending=False, kind='stable').reset_index(drop=True)
+
 # Display results
 print("=" * 90)
 print("ANOMALY DETECTION & VOLATILITY ANALYSIS")
@@ -121,4 +174,21 @@ print(f"\n  Top 3 Monthly Peaks:")
 for _peak_idx2, peak in top_monthly_peaks.iterrows():
     print(f"    {peak['Month_Year']}: {peak['total_operations']:,.0f} operations")
 
+if len(daily_anomalies) > 0:
+    _attribution_day = daily_anomalies.loc[daily_anomalies['total_operations'].idxmax(), 'Date']
+    print(f"\nSPIKE ATTRIBUTION ({_attribution_day.strftime('%Y-%m-%d')}, vs median of reported days in the prior {attribution_baseline_days} calendar days):")
+    _by_type = attribute_operations(_attribution_day, 'operation_type')
+    print(f"\n  By operation type:")
+    for _, _attr in _by_type.iterrows():
+        print(f"    {_attr['operation_type']:<20} {_attr['operations']:>14,.0f} ops ({_attr['ratio_to_baseline']:.1f}× baseline, "
+              f"{_attr['excess_share_pct']:.1f}% of excess)")
+    _by_state = attribute_operations(_attribution_day, 'state')
+    print(f"\n  Top states:")
+    for _, _attr in _by_state.head(5).iterrows():
+        print(f"    {_attr['state']:<25} {_attr['excess']:>+14,.0f} ops ({_attr['excess_share_pct']:.1f}% of excess)")
+    _by_district = attribute_operations(_attribution_day, 'district', within_state=_by_state['state'].iloc[0])
+    print(f"\n  Top districts in {_by_state['state'].iloc[0]}:")
+    for _, _attr in _by_district.head(5).iterrows():
+        print(f"    {_attr['district']:<25} {_attr['excess']:>+14,.0f} ops ({_attr['excess_share_pct']:.1f}% of state excess)")
+
 print("=" * 90)
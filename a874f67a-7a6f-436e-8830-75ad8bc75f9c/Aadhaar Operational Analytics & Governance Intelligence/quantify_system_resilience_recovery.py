@@ -46,36 +46,38 @@ print(f"\n📊 RECOVERY METRICS:")
 print(f"  Baseline operational level: {baseline_ops:,.0f} operations/day")
 print(f"  Recovery threshold (120% of baseline): {recovery_threshold:,.0f} operations/day")
 
-# Analyze recovery from each stress event
-recovery_analysis = []
-
-for i, event in stress_events.iterrows():
-    event_date = event['Date']
-    event_load = event['total_operations']
-    
-    # Look ahead to find when operations return below recovery threshold
-    future_ops = daily_trends[daily_trends['Date'] > event_date].copy()
-    
-    if len(future_ops) > 0:
-        # Find first day operations return below threshold
-        recovered = future_ops[future_ops['total_operations'] <= recovery_threshold]
-        
-        if len(recovered) > 0:
-            recovery_date = recovered.iloc[0]['Date']
-            recovery_days = (recovery_date - event_date).days
-            
-            # Calculate peak excess load
-            peak_excess = ((event_load - baseline_ops) / baseline_ops) * 100
-            
-            recovery_analysis.append({
-                'event_date': event_date,
-                'event_load': event_load,
-                'recovery_date': recovery_date,
-                'recovery_days': recovery_days,
-                'peak_excess_pct': peak_excess,
-                'event_type': 'spike' if event_load > baseline_ops else 'drop'
-            })
-
+def next_recovery_index(values, thresholds):
+    """Index of the first later day at or below threshold for every (region, day), -1 if none, in one reverse pass"""
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    n_days = values.shape[-1]
+    candidate = np.where(values <= np.asarray(thresholds, dtype=float), np.arange(n_days), n_days)
+    next_at_or_below = np.minimum.accumulate(candidate[..., ::-1], axis=-1)[..., ::-1]
+    later = np.concatenate([next_at_or_below[..., 1:], np.full(next_at_or_below.shape[:-1] + (1,), n_days)], axis=-1)
+    return np.where(later < n_days, later, -1)
+
+def event_recovery_days(next_index, event_regions, event_days, day_numbers):
+    """Recovery day index and elapsed calendar days for each (region, day) event via array lookup"""
+    recovery_idx = next_index[..., event_regions, event_days]
+    elapsed = np.where(recovery_idx >= 0, day_numbers[recovery_idx] - day_numbers[event_days], np.nan)
+    return recovery_idx, elapsed
+
+# Analyze recovery from each stress event with one lookup per event
+recovery_dates = pd.DatetimeIndex(daily_trends['Date'])
+recovery_day_numbers = (recovery_dates - recovery_dates[0]).days.to_numpy()
+national_next_recovery = next_recovery_index(daily_trends['total_operations'].to_numpy(), recovery_threshold)
+_event_days = daily_trends.index.get_indexer(stress_events.index)
+_recovery_idx, _recovery_days = event_recovery_days(national_next_recovery, np.zeros(len(_event_days), dtype=int),
+                                                    _event_days, recovery_day_numbers)
+_recovered = _recovery_idx >= 0
+_event_loads = stress_events['total_operations'].to_numpy()[_recovered]
+recovery_analysis = {
+    'event_date': stress_events['Date'].to_numpy()[_recovered],
+    'event_load': _event_loads,
+    'recovery_date': recovery_dates[_recovery_idx[_recovered]],
+    'recovery_days': _recovery_days[_recovered].astype(int),
+    'peak_excess_pct': (_event_loads - baseline_ops) / baseline_ops * 100,
+    'event_type': np.where(_event_loads > baseline_ops, 'spike', 'drop')
+}
 recovery_df = pd.DataFrame(recovery_analysis)
 
 if len(recovery_df) > 0:
@@ -103,6 +105,160 @@ else:
     print(f"     (stress events may be at end of dataset)")
     avg_recovery_days = np.nan
 
+# Recovery for every region and several recovery multipliers in one batched lookup
+print(f"\n" + "=" * 90)
+print("REGIONAL RECOVERY ANALYSIS")
+print("=" * 90)
+
+recovery_multipliers = np.array([1.1, 1.2, 1.5, 2.0])
+regional_recovery_multiplier = 1.2  # Matches the national recovery threshold
+
+def regional_stress_events(region_day_matrix):
+    """Per-region stress days using the daily anomaly rules (z-score or IQR fences) on each region's own row"""
+    values = np.asarray(region_day_matrix, dtype=float)
+    z_scores = np.abs(values - values.mean(axis=1, keepdims=True)) / np.maximum(values.std(axis=1, ddof=1, keepdims=True), 1e-9)
+    q1, q3 = np.quantile(values, [0.25, 0.75], axis=1, keepdims=True)
+    return (z_scores > daily_zscore_threshold) | (values > q3 + 1.5 * (q3 - q1)) | (values < q1 - 1.5 * (q3 - q1))
+
+def mean_recovery_days(next_index, event_regions, event_days, n_regions):
+    """Recovered-event counts and mean recovery days per region, for each threshold layer of next_index"""
+    _, elapsed = event_recovery_days(next_index, event_regions, event_days, recovery_day_numbers)
+    elapsed = elapsed.reshape(-1, len(event_days))
+    n_recovered = np.zeros((len(elapsed), n_regions))
+    total_days = np.zeros((len(elapsed), n_regions))
+    for _layer in range(len(elapsed)):
+        np.add.at(n_recovered[_layer], event_regions, ~np.isnan(elapsed[_layer]))
+        np.add.at(total_days[_layer], event_regions, np.nan_to_num(elapsed[_layer]))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return n_recovered, total_days / n_recovered
+
+# National sensitivity: the same stress events against every multiplier
+_national_layers = next_recovery_index(daily_trends['total_operations'].to_numpy(),
+                                       baseline_ops * recovery_multipliers[:, None, None])
+_, national_recovery_by_multiplier = mean_recovery_days(_national_layers, np.zeros(len(_event_days), dtype=int),
+                                                        _event_days, 1)
+print(f"\n📊 NATIONAL RECOVERY BY THRESHOLD MULTIPLIER:")
+for _mult, _mult_days in zip(recovery_multipliers, national_recovery_by_multiplier[:, 0]):
+    print(f"  {_mult:.1f}× baseline ({baseline_ops * _mult:>12,.0f} ops): "
+          + (f"{_mult_days:.1f} days average" if not np.isnan(_mult_days) else "no recoveries"))
+
+# Districts and states: own baselines, own stress events, every multiplier in one pass
+def regional_recovery_table(region_day_matrix, regions):
+    """Stress events and mean recovery days per region at each multiplier (columns recovery_days_<m>x)"""
+    values = np.asarray(region_day_matrix, dtype=float)
+    stress = regional_stress_events(values)
+    event_regions, event_days = np.nonzero(stress)
+    next_index = next_recovery_index(values, recovery_multipliers[:, None, None] * np.median(values, axis=1)[None, :, None])
+    n_recovered, mean_days = mean_recovery_days(next_index, event_regions, event_days, len(values))
+    table = regions.copy()
+    table['stress_events'] = stress.sum(axis=1)
+    table['recovered_events'] = n_recovered[np.isclose(recovery_multipliers, regional_recovery_multiplier)][0].astype(int)
+    for _mult, _mult_days in zip(recovery_multipliers, mean_days):
+        table[f'recovery_days_{_mult:g}x'] = _mult_days
+    return table
+
+district_recovery = regional_recovery_table(district_daily_operations, panel_districts)
+state_recovery = regional_recovery_table(state_daily_operations, pd.DataFrame({'state': panel_states}))
+regional_recovery_column = f'recovery_days_{regional_recovery_multiplier:g}x'
+
+print(f"\n📊 REGIONAL RECOVERY ({regional_recovery_multiplier}× each region's own median):")
+print(f"  Districts with stress events: {(district_recovery['stress_events'] > 0).sum():,} of {len(district_recovery):,}")
+print(f"  Median district recovery time: {district_recovery[regional_recovery_column].median():.1f} days")
+print(f"\n  Slowest-recovering districts:")
+for _, _rec_row in district_recovery.nlargest(5, regional_recovery_column).iterrows():
+    print(f"    {_rec_row['district']}, {_rec_row['state']}: {_rec_row[regional_recovery_column]:.1f} days "
+          f"({_rec_row['stress_events']} stress events)")
+print(f"\n  States:")
+for _, _rec_row in state_recovery.sort_values(regional_recovery_column, ascending=False).iterrows():
+    print(f"    {_rec_row['state']}: {_rec_row[regional_recovery_column]:.1f} days ({_rec_row['stress_events']} stress events)")
+
+# Stress episodes: consecutive (or nearly consecutive) high-load stress days merged into one event
+print(f"\n" + "=" * 90)
+print("STRESS EPISODE SEGMENTATION")
+print("=" * 90)
+
+episode_gap_tolerance = 1  # Up to 1 calendar day between stress days stays within the same episode
+
+def segment_stress_episodes(stress, values, baselines, thresholds, gap_tolerance=episode_gap_tolerance,
+                            day_numbers=recovery_day_numbers):
+    """One row per stress episode of every series, merging stress days within gap_tolerance calendar days"""
+    stress = np.atleast_2d(np.asarray(stress, dtype=bool))
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    n_days = stress.shape[1]
+    stress_series, stress_days = np.nonzero(stress)
+    # Gaps are counted in calendar days, not rows: the date axis skips unreported dates
+    calendar_gaps = np.diff(day_numbers[stress_days]) - 1
+    
+    new_episode = np.ones(len(stress_days), dtype=bool)
+    new_episode[1:] = (stress_series[1:] != stress_series[:-1]) | (calendar_gaps > gap_tolerance)
+    first_day = np.flatnonzero(new_episode)
+    last_day = np.append(first_day[1:], len(stress_days)) - 1
+    series, starts, ends = stress_series[first_day], stress_days[first_day], stress_days[last_day]
+    
+    # Every (episode, day) cell as a flat position into the series × day arrays
+    lengths = ends - starts + 1
+    labels = np.repeat(np.arange(len(starts)), lengths)
+    positions = series[labels] * n_days + starts[labels] + np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    flat_values = values.ravel()[positions]
+    peak_order = np.lexsort((-flat_values, labels))
+    peak_positions = positions[peak_order[np.searchsorted(labels[peak_order], np.arange(len(starts)))]]
+    excess = np.maximum(flat_values - np.asarray(baselines, dtype=float)[series[labels]], 0)
+    
+    next_index = next_recovery_index(values, np.asarray(thresholds, dtype=float)[:, None])
+    recovery_idx = next_index[series, ends]
+    return pd.DataFrame({
+        'series': series,
+        'start_day': starts,
+        'end_day': ends,
+        'peak_day': peak_positions % n_days,
+        'peak_value': values.ravel()[peak_positions],
+        'stress_days': np.bincount(labels, weights=stress.ravel()[positions], minlength=len(starts)).astype(int),
+        'duration_days': day_numbers[ends] - day_numbers[starts] + 1,
+        'area_above_baseline': np.bincount(labels, weights=excess, minlength=len(starts)),
+        'recovery_day': recovery_idx,
+        'recovery_days': np.where(recovery_idx >= 0, day_numbers[recovery_idx] - day_numbers[ends], np.nan)
+    })
+
+# National, state and district series stacked so every level is segmented together
+episode_series = pd.concat([
+    pd.DataFrame({'level': ['National'], 'state': ['All'], 'district': ['All']}),
+    pd.DataFrame({'level': 'State', 'state': panel_states, 'district': 'All'}),
+    panel_districts.assign(level='District')[['level', 'state', 'district']]
+], ignore_index=True)
+_episode_values = np.vstack([daily_trends['total_operations'].to_numpy(dtype=float)[None, :],
+                             state_daily_operations, district_daily_operations])
+_episode_baselines = np.median(_episode_values, axis=1)
+# High-load stress only: anomaly days above the series' own baseline
+_episode_stress = np.vstack([daily_stats['is_anomaly'].to_numpy()[None, :],
+                             regional_stress_events(state_daily_operations),
+                             regional_stress_events(district_daily_operations)]) & (_episode_values > _episode_baselines[:, None])
+stress_episodes = segment_stress_episodes(_episode_stress, _episode_values, _episode_baselines,
+                                          _episode_baselines * regional_recovery_multiplier)
+stress_episodes = episode_series.iloc[stress_episodes['series']].reset_index(drop=True).join(stress_episodes)
+for _day_col in ['start_day', 'end_day', 'peak_day']:
+    stress_episodes[_day_col.replace('_day', '_date')] = recovery_dates[stress_episodes[_day_col].to_numpy()]
+
+national_episodes = stress_episodes[stress_episodes['level'] == 'National']
+print(f"\n📊 NATIONAL EPISODES (gap tolerance: {episode_gap_tolerance} calendar day):")
+print(f"  High-load stress days: {int(_episode_stress[0].sum())} → {len(national_episodes)} episodes")
+for _, _episode in national_episodes.nlargest(5, 'area_above_baseline').iterrows():
+    _recovery_text = f"recovered {_episode['recovery_days']:.0f} days after" if not np.isnan(_episode['recovery_days']) else "not yet recovered"
+    print(f"  {_episode['start_date'].strftime('%Y-%m-%d')} → {_episode['end_date'].strftime('%Y-%m-%d')}: "
+          f"{_episode['duration_days']} days, peak {_episode['peak_value']:,.0f} on {_episode['peak_date'].strftime('%Y-%m-%d')}, "
+          f"{_episode['area_above_baseline']:,.0f} excess ops, {_recovery_text}")
+
+print(f"\n📊 REGIONAL EPISODES:")
+for _level in ['State', 'District']:
+    _level_episodes = stress_episodes[stress_episodes['level'] == _level]
+    print(f"  {_level}: {len(_level_episodes):,} episodes from {int(_level_episodes['stress_days'].sum()):,} stress days, "
+          f"mean duration {_level_episodes['duration_days'].mean():.1f} days")
+print(f"\n  Longest district episodes:")
+for _, _episode in (stress_episodes[stress_episodes['level'] == 'District']
+                    .sort_values(['duration_days', 'area_above_baseline'], ascending=False).head(5).iterrows()):
+    print(f"    {_episode['district']}, {_episode['state']}: {_episode['start_date'].strftime('%Y-%m-%d')} → "
+          f"{_episode['end_date'].strftime('%Y-%m-%d')} ({_episode['duration_days']} days, "
+          f"{_episode['area_above_baseline']:,.0f} excess ops)")
+
 # Resilience metrics
 print(f"\n" + "=" * 90)
 print("SYSTEM RESILIENCE METRICS")
@@ -154,30 +310,25 @@ print("=" * 90)
 
 # Calculate composite resilience score (0-100)
 # Higher is better
-components = []
-
-# Low stress frequency is good (max 10 points if <5% days are stress events)
-stress_freq_score = max(0, min(10, 10 * (1 - (stress_event_frequency / 20))))
-components.append(('Stress Event Frequency', stress_freq_score))
-
-# Low volatility is good (max 20 points if CV < 50%)
-volatility_score = max(0, min(20, 20 * (1 - (load_cv / 200))))
-components.append(('Load Stability', volatility_score))
-
-# High spare capacity is good (max 30 points if utilization < 50%)
-spare_capacity_score = max(0, min(30, 30 * (1 - (capacity_utilization / 100))))
-components.append(('Spare Capacity', spare_capacity_score))
-
-# Fast recovery is good (max 20 points if < 2 days)
-if not np.isnan(avg_recovery_days):
-    recovery_score = max(0, min(20, 20 * (1 - (avg_recovery_days / 10))))
-else:
-    recovery_score = 10  # Neutral score if no data
-components.append(('Recovery Speed', recovery_score))
-
-# High absorption capacity is good (max 20 points if >500% baseline)
-absorption_score = min(20, (stress_absorption_capacity / 500) * 20)
-components.append(('Stress Absorption', absorption_score))
+def resilience_component_scores(stress_event_frequency, load_cv, capacity_utilization, avg_recovery_days,
+                                stress_absorption_capacity):
+    """Five resilience components; inputs may be scalars (national) or arrays (one entry per region)"""
+    return {
+        # Low stress frequency is good (max 10 points if <5% days are stress events)
+        'Stress Event Frequency': np.clip(10 * (1 - (np.asarray(stress_event_frequency) / 20)), 0, 10),
+        # Low volatility is good (max 20 points if CV < 50%)
+        'Load Stability': np.clip(20 * (1 - (np.asarray(load_cv) / 200)), 0, 20),
+        # High spare capacity is good (max 30 points if utilization < 50%)
+        'Spare Capacity': np.clip(30 * (1 - (np.asarray(capacity_utilization) / 100)), 0, 30),
+        # Fast recovery is good (max 20 points if < 2 days); neutral score if no data
+        'Recovery Speed': np.where(np.isnan(avg_recovery_days), 10,
+                                   np.clip(20 * (1 - (np.asarray(avg_recovery_days, dtype=float) / 10)), 0, 20)),
+        # High absorption capacity is good (max 20 points if >500% baseline)
+        'Stress Absorption': np.minimum(20, (np.asarray(stress_absorption_capacity) / 500) * 20)
+    }
+
+components = [(name, float(score)) for name, score in resilience_component_scores(
+    stress_event_frequency, load_cv, capacity_utilization, avg_recovery_days, stress_absorption_capacity).items()]
 
 total_resilience_score = sum([s for _, s in components])
 
@@ -197,6 +348,60 @@ else:
     assessment = "CONCERNING - System under significant stress; immediate intervention needed"
 print(f"    {assessment}")
 
+# Same score for every state and district from the region × day panels
+print(f"\n" + "=" * 90)
+print("REGIONAL RESILIENCE SCORE PANEL")
+print("=" * 90)
+
+def regional_resilience_table(region_day_matrix, recovery_table):
+    """Resilience components, total score and rank (1 = least resilient) per region; sparse regions score 0 and are flagged"""
+    values = np.asarray(region_day_matrix, dtype=float)
+    means = values.mean(axis=1)
+    medians = np.median(values, axis=1)
+    active, has_baseline = means > 0, medians > 0
+    safe_means, safe_medians = np.where(active, means, 1), np.where(has_baseline, medians, 1)
+    inputs = {
+        'stress_event_frequency': recovery_table['stress_events'].to_numpy() / values.shape[1] * 100,
+        'load_cv': np.where(active, values.std(axis=1, ddof=1) / safe_means * 100, np.nan),
+        'capacity_utilization': np.where(active, means / np.where(active, values.max(axis=1), 1) * 100, np.nan),
+        'avg_recovery_days': recovery_table[regional_recovery_column].to_numpy(),
+        'stress_absorption_capacity': np.where(
+            has_baseline, (np.quantile(values, 0.99, axis=1) - medians) / safe_medians * 100, np.nan)
+    }
+    table = recovery_table.drop(columns=[col for col in recovery_table.columns if col.startswith('recovery_days_')])
+    table = table.assign(**inputs)
+    table['sparse_baseline'] = ~has_baseline
+    # Recovery Speed already maps NaN (no events) to its neutral score; other undefined components score 0
+    scores = {name: np.nan_to_num(score, nan=0.0) for name, score in resilience_component_scores(**inputs).items()}
+    for name, score in scores.items():
+        table[name.lower().replace(' ', '_') + '_score'] = score
+    table['resilience_score'] = np.sum(list(scores.values()), axis=0)
+    table = table.sort_values('resilience_score', kind='stable', na_position='first').reset_index(drop=True)
+    table['resilience_rank'] = np.arange(1, len(table) + 1)
+    return table
+
+district_resilience = regional_resilience_table(district_daily_operations, district_recovery)
+state_resilience = regional_resilience_table(state_daily_operations, state_recovery)
+
+print(f"\n📊 DISTRICT RESILIENCE DISTRIBUTION ({len(district_resilience):,} districts):")
+print(f"  Median score: {district_resilience['resilience_score'].median():.1f} / 100")
+print(f"  Range: {district_resilience['resilience_score'].min():.1f} - {district_resilience['resilience_score'].max():.1f}")
+print(f"  Below 30 (CONCERNING): {(district_resilience['resilience_score'] < 30).sum():,} districts")
+print(f"  Sparse baseline (zero median daily load, scored worst on undefined components): "
+      f"{district_resilience['sparse_baseline'].sum():,} districts")
+
+print(f"\n⚠️ LEAST RESILIENT DISTRICTS:")
+print(f"  {'Rank':<5} {'District':<24} {'State':<20} {'Score':>6} {'Freq':>6} {'Stab':>6} {'Spare':>6} {'Recov':>6} {'Absorb':>7}")
+for _, _res_row in district_resilience.head(10).iterrows():
+    print(f"  {_res_row['resilience_rank']:<5} {str(_res_row['district'])[:24]:<24} {str(_res_row['state'])[:20]:<20} "
+          f"{_res_row['resilience_score']:>6.1f} {_res_row['stress_event_frequency_score']:>6.1f} "
+          f"{_res_row['load_stability_score']:>6.1f} {_res_row['spare_capacity_score']:>6.1f} "
+          f"{_res_row['recovery_speed_score']:>6.1f} {_res_row['stress_absorption_score']:>7.1f}")
+
+print(f"\n📊 STATE RESILIENCE RANKING (least resilient first):")
+for _, _res_row in state_resilience.iterrows():
+    print(f"  {_res_row['resilience_rank']:>3}. {_res_row['state']}: {_res_row['resilience_score']:.1f} / 100")
+
 # Recommendations
 print(f"\n" + "=" * 90)
 print("RESILIENCE IMPROVEMENT RECOMMENDATIONS")
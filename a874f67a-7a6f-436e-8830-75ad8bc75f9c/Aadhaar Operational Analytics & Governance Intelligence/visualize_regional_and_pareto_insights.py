@@ -21,7 +21,7 @@ bars1 = ax1.barh(range(len(top_stress_states)), top_stress_states['stress_score'
 
 ax1.set_yticks(range(len(top_stress_states)))
 ax1.set_yticklabels(top_stress_states['state'], color=text_color, fontsize=10)
-ax1.set_xlabel('Stress Score (Updates/Enrolment Ratio)', color=text_color, fontsize=11, fontweight='bold')
+ax1.set_xlabel('Stress Score (Empirical-Bayes Updates/Enrolment Ratio)', color=text_color, fontsize=11, fontweight='bold')
 ax1.set_title('Top 10 States by Operational Stress Score', color=text_color, fontsize=14, fontweight='bold', pad=20)
 ax1.tick_params(axis='x', colors=text_color)
 ax1.tick_params(axis='y', colors=text_color)